@@ -0,0 +1,201 @@
+"""
+Time the validator plugins against synthetic ledgers and record JSON baselines.
+
+Usage::
+
+    python -m benchmarks.run --sizes 10000 100000 1000000 --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --sizes 10000 100000 --compare benchmarks/results/<baseline>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import functools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from beancount_plugins.validators import combined, shared_ratio, transactions
+
+from .ledger import LedgerSpec, generate_ledger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from types import ModuleType
+
+    from beancount.core import data
+
+PLUGINS: dict[str, Callable[[data.Entries, data.Options], tuple[data.Entries, list[object]]]] = {
+    "transactions": transactions.validate_transactions,
+    "shared_ratio": shared_ratio.validate_shared_ratio,
+    "combined": combined.validate_ledger,
+}
+
+# Module-level callables and methods timed individually to split a plugin run into phases, next to the whole run.
+# Entries are collected in the time the phases leave out. Plugins not listed here report their phases through the
+# transactions validator's instrumentation option.
+PHASES: dict[str, tuple[tuple[ModuleType | type, str], ...]] = {
+    "shared_ratio": ((shared_ratio.SharedRatioCheck, "errors"), (shared_ratio, "calculate_shared_ratio")),
+}
+
+
+@contextlib.contextmanager
+def _timed_phases(phases: tuple[tuple[ModuleType | type, str], ...]) -> Iterator[dict[str, float]]:
+    """Patch each phase function with a wrapper that accumulates its wall time under its qualified name."""
+    totals: dict[str, float] = {}
+    originals: list[tuple[ModuleType | type, str, object]] = []
+
+    def wrap(name: str, func: Callable[..., object]) -> Callable[..., object]:
+        @functools.wraps(func)
+        def timed(*args: object, **kwargs: object) -> object:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                totals[name] = totals.get(name, 0.0) + time.perf_counter() - start
+
+        return timed
+
+    for owner, name in phases:
+        func = getattr(owner, name)
+        originals.append((owner, name, func))
+        setattr(owner, name, wrap(func.__qualname__, func))
+    try:
+        yield totals
+    finally:
+        for owner, name, func in originals:
+            setattr(owner, name, func)
+
+
+def _instrumented_phases(
+    plugin: Callable[..., tuple[data.Entries, list[object]]], entries: list[data.Directive]
+) -> dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix="beancount-plugins-bench-") as report_dir:
+        report = Path(report_dir) / "instrumentation.json"
+        plugin(list(entries), {}, f"instrumentation={report}")
+        return {row["check"]: row["seconds"] for row in json.loads(report.read_text())}
+
+
+def _run_plugin(name: str, entries: list[data.Directive], repeat: int) -> dict[str, object]:
+    plugin = PLUGINS[name]
+    runs: list[float] = []
+    errors: list[object] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, errors = plugin(list(entries), {})
+        runs.append(time.perf_counter() - start)
+
+    if name in PHASES:
+        with _timed_phases(PHASES[name]) as phases:
+            start = time.perf_counter()
+            plugin(list(entries), {})
+            phases[plugin.__qualname__] = time.perf_counter() - start
+    else:
+        phases = _instrumented_phases(plugin, entries)
+
+    return {
+        "best_s": min(runs),
+        "runs_s": runs,
+        "errors": len(errors),
+        "phases_s": dict(sorted(phases.items())),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=False,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def run(sizes: list[int], repeat: int, plugins: list[str], spec_kwargs: dict[str, object]) -> dict[str, object]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="beancount-plugins-bench-") as document_root:
+        for size in sizes:
+            start = time.perf_counter()
+            entries = generate_ledger(LedgerSpec(entries=size, **spec_kwargs), Path(document_root))
+            generate_s = time.perf_counter() - start
+            print(f"{size:>10} requested, {len(entries)} generated in {generate_s:.2f}s", file=sys.stderr)
+
+            plugin_results = {}
+            for name in plugins:
+                plugin_results[name] = _run_plugin(name, entries, repeat)
+                print(f"{'':>10} {name}: {plugin_results[name]['best_s']:.3f}s", file=sys.stderr)
+            results.append(
+                {"requested": size, "entries": len(entries), "generate_s": generate_s, "plugins": plugin_results}
+            )
+
+    return {
+        "commit": _git_commit(),
+        "created": dt.datetime.now(tz=dt.UTC).isoformat(timespec="seconds"),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "spec": spec_kwargs,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    """Render a table of best-of-N plugin times against a baseline run of the same sizes."""
+    baseline_times = {
+        (result["requested"], name): plugin["best_s"]
+        for result in baseline["results"]
+        for name, plugin in result["plugins"].items()
+    }
+    lines = [f"{'entries':>10}  {'plugin':<14}{'baseline':>10}{'current':>10}{'change':>9}"]
+    for result in current["results"]:
+        for name, plugin in result["plugins"].items():
+            before = baseline_times.get((result["requested"], name))
+            change = f"{plugin['best_s'] / before - 1:+.1%}" if before else "n/a"
+            before_str = f"{before:.3f}" if before else "n/a"
+            lines.append(f"{result['requested']:>10}  {name:<14}{before_str:>10}{plugin['best_s']:>10.3f}{change:>9}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--plugins", nargs="+", choices=sorted(PLUGINS), default=sorted(PLUGINS))
+    parser.add_argument("--parties", type=int, default=2, help="number of parties (Francis, Leyna, then Party3...)")
+    parser.add_argument("--journals-per-party", type=int, default=3)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this path")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare the results against")
+    args = parser.parse_args(argv)
+
+    parties = ("Francis", "Leyna", *(f"Party{index}" for index in range(3, args.parties + 1)))[: args.parties]
+    spec_kwargs = {
+        "parties": parties,
+        "journals_per_party": args.journals_per_party,
+        "years": args.years,
+        "seed": args.seed,
+    }
+    current = run(args.sizes, args.repeat, args.plugins, spec_kwargs)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(current, indent=2) + "\n")
+    if args.compare:
+        print(compare(current, json.loads(args.compare.read_text())))
+    elif not args.output:
+        print(json.dumps(current, indent=2))
+
+
+if __name__ == "__main__":
+    main()
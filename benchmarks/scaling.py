@@ -0,0 +1,97 @@
+"""
+Time validate_transactions with an increasing number of workers on each backend, to show how validation scales.
+
+Usage::
+
+    python -m benchmarks.scaling --size 100000 --workers 1 2 4 8 --backends thread process
+
+Threads only run in parallel on a free-threaded (no-GIL) interpreter. Elsewhere the thread backend validates
+serially, and its rows show that fallback rather than scaling.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from beancount_plugins.validators import transactions
+
+from .ledger import LedgerSpec, generate_ledger
+
+
+def _best_time(entries: list[object], config: str, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transactions.validate_transactions(list(entries), {}, config)
+        runs.append(time.perf_counter() - start)
+    return min(runs)
+
+
+def run(size: int, workers: list[int], backends: list[str], repeat: int, spec_kwargs: dict[str, object]) -> dict:
+    with tempfile.TemporaryDirectory(prefix="beancount-plugins-bench-") as document_root:
+        entries = generate_ledger(LedgerSpec(entries=size, **spec_kwargs), Path(document_root))
+        files = len({entry.meta["filename"] for entry in entries})
+        print(f"{len(entries)} entries in {files} journal files", file=sys.stderr)
+        results = [
+            {
+                "backend": backend,
+                "workers": count,
+                "best_s": _best_time(entries, f"workers={count};backend={backend};documents=off", repeat),
+            }
+            for backend in backends
+            for count in workers
+        ]
+    return {
+        "python": sys.version,
+        "free_threaded": transactions._free_threaded(),  # noqa: SLF001
+        "entries": len(entries),
+        "journal_files": files,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def format_table(report: dict) -> str:
+    serial = {row["backend"]: row["best_s"] for row in report["results"] if row["workers"] == 1}
+    lines = [
+        f"free-threaded: {report['free_threaded']}, {report['entries']} entries, {report['journal_files']} files",
+        f"{'backend':<10}{'workers':>8}{'seconds':>10}{'speedup':>9}",
+    ]
+    for row in report["results"]:
+        baseline = serial.get(row["backend"])
+        speedup = f"{baseline / row['best_s']:.2f}x" if baseline else "n/a"
+        lines.append(f"{row['backend']:<10}{row['workers']:>8}{row['best_s']:>10.3f}{speedup:>9}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--backends", nargs="+", choices=["process", "thread"], default=["thread", "process"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--journals-per-party", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.size,
+        args.workers,
+        args.backends,
+        args.repeat,
+        {"journals_per_party": args.journals_per_party, "seed": args.seed},
+    )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(format_table(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .errors import SuppressedErrorsSummary, message_template
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+SUPPRESSED_ERRORS = message_template("... and {} more {} errors in {} (showing the first {})")
+
+
+def cap_errors(errors: Iterable[object], cap: int) -> list[object]:
+    """
+    Keep at most `cap` errors of each rule per journal file, in order.
+
+    Errors are grouped by their rule `code`, or by their type if they have none. The first error over the cap in each
+    group is replaced by one summary error, at the same location, counting the errors left out. Errors without a
+    source file are always kept.
+    """
+    capped: list[object] = []
+    counts: dict[tuple[str, str], int] = {}
+    summary_positions: dict[tuple[str, str], int] = {}
+
+    for err in errors:
+        source = getattr(err, "source", None)
+        if not source or "filename" not in source:
+            capped.append(err)
+            continue
+        key = (getattr(err, "code", type(err).__name__), source["filename"])
+        count = counts.get(key, 0) + 1
+        counts[key] = count
+        if count <= cap:
+            capped.append(err)
+        elif count == cap + 1:
+            summary_positions[key] = len(capped)
+            capped.append(err)
+
+    for (rule, filename), position in summary_positions.items():
+        suppressed = counts[rule, filename] - cap
+        capped[position] = SuppressedErrorsSummary(
+            capped[position].source, SUPPRESSED_ERRORS, None, suppressed, rule, filename, cap
+        )
+    return capped
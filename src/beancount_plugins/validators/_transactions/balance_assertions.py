@@ -5,11 +5,17 @@ from typing import TYPE_CHECKING
 
 from dateutil.relativedelta import relativedelta
 
-from .errors import BalanceAssertionError
+from .errors import BalanceAssertionError, message_template
 
 if TYPE_CHECKING:
     from beancount.core import data
 
+MISSING_STATEMENT_META = message_template("Missing required metadata of 'statement'")
+WRONG_STATEMENT_DATE = message_template(
+    "Statement file must be date one month from the balance assertion date ({}.pdf), "
+    "or a closing statement (_closing-statement.pdf)"
+)
+
 
 def validate_balance_assertion(entry: data.Balance) -> list[BalanceAssertionError]:
     errors: list[BalanceAssertionError] = []
@@ -18,7 +24,7 @@ def validate_balance_assertion(entry: data.Balance) -> list[BalanceAssertionErro
         return [
             BalanceAssertionError(
                 entry.meta,
-                "Missing required metadata of 'statement'",
+                MISSING_STATEMENT_META,
                 entry,
             )
         ]
@@ -33,9 +39,9 @@ def validate_balance_assertion(entry: data.Balance) -> list[BalanceAssertionErro
         errors.append(
             BalanceAssertionError(
                 entry.meta,
-                f"Statement file must be date one month from the balance assertion date "
-                f"({valid_statement_date}.pdf), or a closing statement (_closing-statement.pdf)",
+                WRONG_STATEMENT_DATE,
                 entry,
+                valid_statement_date,
             )
         )
 
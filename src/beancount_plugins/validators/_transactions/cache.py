@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import hashlib
+import pickle
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from beancount.core import data
+
+from .events import event_references
+from .journal import JournalResult
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from .events import EventRegistry
+    from .scope import ValidationScope
+
+CACHE_VERSION = 3
+
+
+class CachedJournal(NamedTuple):
+    fingerprint: bytes
+    result: JournalResult
+    event_references: frozenset[str]
+    missing_events: frozenset[str]
+
+
+@functools.cache
+def _plugin_fingerprint() -> str:
+    """Hash the validator sources, so results cached by a different version of the rules are discarded."""
+    digest = hashlib.blake2b(digest_size=16)
+    for source in sorted(Path(__file__).parent.parent.rglob("*.py")):
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def journal_fingerprint(filename: str, entries: Sequence[data.Directive]) -> bytes | None:
+    """
+    Fingerprint a journal file from its source bytes, its entry count and its initialise_journal_file directive.
+
+    Hashing the entries themselves costs more than validating them, so the file they were parsed from stands in
+    for their content. Return None for entries that do not come from a readable file.
+    """
+    try:
+        source = Path(filename).read_bytes()
+    except OSError:
+        return None
+    digest = hashlib.blake2b(source, digest_size=32)
+    digest.update(str(len(entries)).encode())
+    for entry in entries:
+        if isinstance(entry, data.Custom) and entry.type == "initialise_journal_file":
+            digest.update(repr([value.value for value in entry.values]).encode())
+    return digest.digest()
+
+
+def cache_settings(rules: Iterable[str], scope: ValidationScope | None = None) -> tuple[object, ...]:
+    """Return what cached results depend on besides the journals themselves."""
+    return (
+        CACHE_VERSION,
+        dt.datetime.now(tz=dt.UTC).date().isoformat(),
+        _plugin_fingerprint(),
+        tuple(sorted(rules)),
+        scope,
+    )
+
+
+def _is_cached_journals(journals: object) -> bool:
+    """Return whether `journals`, loaded from a cache file, has the shape this plugin writes."""
+    return isinstance(journals, dict) and all(
+        isinstance(filename, str)
+        and isinstance(cached, CachedJournal)
+        and isinstance(cached.fingerprint, bytes)
+        and isinstance(cached.result, JournalResult)
+        and all(isinstance(field, list) for field in cached.result)
+        and all(isinstance(error, tuple) and len(error) == 3 for error in cached.result.errors)  # noqa: PLR2004
+        and isinstance(cached.event_references, frozenset)
+        and isinstance(cached.missing_events, frozenset)
+        for filename, cached in journals.items()
+    )
+
+
+def _fits(result: JournalResult, entries: Sequence[data.Directive]) -> bool:
+    """Return whether every position in `result` is one of `entries`, and every posting index one of its postings."""
+
+    def is_position(position: object) -> bool:
+        return isinstance(position, int) and 0 <= position < len(entries)
+
+    return all(
+        is_position(position)
+        and (
+            posting is None
+            or (isinstance(posting, int) and 0 <= posting < len(getattr(entries[position], "postings", ())))
+        )
+        for position, posting, _ in result.errors
+    ) and all(
+        is_position(position)
+        for positions in (result.document_positions, result.dropped_statements, result.unchecked_documents)
+        for position in positions
+    )
+
+
+class ValidationCache:
+    """
+    Per-journal-file validation results kept between runs, in memory and in the file at `path` when one is given.
+
+    The whole cache is discarded when the validator sources, the enabled rules, the validation scope or the date
+    change, since balance assertions depend on today's date. A cached file is only reused while the linked events it
+    refers to resolve the same way.
+    """
+
+    def __init__(self, path: Path | None, rules: Iterable[str], scope: ValidationScope | None = None) -> None:
+        self.path = path
+        self.settings = cache_settings(rules, scope)
+        self.journals: dict[str, CachedJournal] = self._load()
+        self.dirty = False
+
+    def _load(self) -> dict[str, CachedJournal]:
+        if self.path is None:
+            return {}
+        try:
+            source = self.path.read_bytes()
+        except OSError:
+            return {}
+        try:
+            settings, journals = pickle.loads(source)  # noqa: S301 - the cache file is written by this plugin
+        except Exception:  # noqa: BLE001 - a corrupted pickle can raise almost anything, and is only a cache miss
+            return {}
+        if settings != self.settings or not _is_cached_journals(journals):
+            return {}
+        return journals
+
+    def save(self) -> None:
+        """Write the cache through a temporary file, so concurrent runs never read a partly written cache."""
+        if not self.dirty or self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.path.parent, prefix=f".{self.path.name}.", delete=False) as file:
+            file.write(pickle.dumps((self.settings, self.journals), protocol=pickle.HIGHEST_PROTOCOL))
+        Path(file.name).replace(self.path)
+        self.dirty = False
+
+    def lookup(
+        self, filename: str, fingerprint: bytes, entries: Sequence[data.Directive], events: EventRegistry
+    ) -> JournalResult | None:
+        """Return the cached result for the journal file's `entries`, if it is still valid and fits them."""
+        cached = self.journals.get(filename)
+        if cached is None or cached.fingerprint != fingerprint or not _fits(cached.result, entries):
+            return None
+        missing_events = frozenset(event_id for event_id in cached.event_references if event_id not in events)
+        if missing_events != cached.missing_events:
+            return None
+        return cached.result
+
+    def store(
+        self,
+        filename: str,
+        fingerprint: bytes,
+        entries: Sequence[data.Directive],
+        result: JournalResult,
+        events: EventRegistry,
+    ) -> None:
+        references = event_references(entries)
+        missing_events = frozenset(event_id for event_id in references if event_id not in events)
+        self.journals[filename] = CachedJournal(fingerprint, result, references, missing_events)
+        self.dirty = True
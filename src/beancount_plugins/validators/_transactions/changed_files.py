@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from .errors import PluginConfigError, message_template
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+GIT_FAILED = message_template("Could not list the changed journal files with git, validating every file: {}")
+
+
+class ChangedFiles(NamedTuple):
+    """
+    The journal files to validate in full: `paths`, or those git reports as changed since `revision`.
+
+    Relative paths are taken from the directory of the ledger's main file.
+    """
+
+    paths: tuple[str, ...] = ()
+    revision: str | None = None
+
+
+def changed_files(value: str) -> ChangedFiles:
+    """Parse `git`, `git:<revision>` or a comma-separated list of paths."""
+    if value == "git":
+        return ChangedFiles(revision="HEAD")
+    if value.startswith("git:") and value.removeprefix("git:").strip():
+        revision = value.removeprefix("git:").strip()
+        if revision.startswith("-"):
+            msg = f"expected a git revision, got {revision!r}"
+            raise ValueError(msg)
+        return ChangedFiles(revision=revision)
+    paths = tuple(path.strip() for path in value.split(",") if path.strip())
+    if not paths:
+        msg = f"expected git, git:<revision> or a comma-separated list of files, got {value!r}"
+        raise ValueError(msg)
+    return ChangedFiles(paths)
+
+
+def _git(directory: Path, *args: str) -> str:
+    try:
+        result = subprocess.run(  # noqa: S603 - no shell, and revisions are passed after --end-of-options
+            ["git", "-C", str(directory), *args],  # noqa: S607
+            capture_output=True,
+            check=False,
+            text=True,
+        )
+    except OSError as exc:
+        raise ValueError(str(exc)) from exc
+    if result.returncode != 0:
+        raise ValueError(result.stderr.strip() or f"git {args[0]} exited with status {result.returncode}")
+    return result.stdout
+
+
+def git_changed_paths(directory: Path, revision: str) -> list[Path]:
+    """Return the files of the work tree at `directory` that differ from `revision`, including untracked ones."""
+    top_level = Path(_git(directory, "rev-parse", "--show-toplevel").strip())
+    changed = _git(top_level, "diff", "--name-only", "-z", "--end-of-options", revision, "--")
+    untracked = _git(top_level, "ls-files", "--others", "--exclude-standard", "-z")
+    return [top_level / name for name in f"{changed}{untracked}".split("\0") if name]
+
+
+def changed_journal_files(
+    changed: ChangedFiles, filenames: Iterable[str], ledger_filename: str
+) -> tuple[frozenset[str] | None, list[PluginConfigError]]:
+    """
+    Return those of the ledger's `filenames` that `changed` selects, or None when they cannot be listed.
+
+    Files are compared by their resolved paths, so the same journal is recognised however its path is spelled.
+    """
+    directory = Path(ledger_filename).parent if Path(ledger_filename).is_file() else Path.cwd()
+    try:
+        paths = git_changed_paths(directory, changed.revision) if changed.revision else map(Path, changed.paths)
+    except ValueError as exc:
+        return None, [PluginConfigError(None, GIT_FAILED, None, str(exc))]
+    selected = {(directory / path).resolve() for path in paths}
+    return frozenset(filename for filename in set(filenames) if Path(filename).resolve() in selected), []
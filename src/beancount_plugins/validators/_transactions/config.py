@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from .changed_files import ChangedFiles, changed_files
+from .errors import PluginConfigError, message_template
+from .profiling import profile_modes
+from .scope import ValidationScope
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+INVALID_OPTION = message_template("Invalid plugin config option: {}")
+INVALID_OPTION_VALUE = message_template("Invalid value for plugin config option {}: {}")
+INVALID_ENV_VAR_VALUE = message_template("Invalid value for environment variable {}: {}")
+
+# Sets `fail_fast` when the plugin config does not.
+FAIL_FAST_ENV_VAR = "BEANCOUNT_PLUGINS_FAIL_FAST"
+
+# Where `workers` validate journal files: worker processes, or threads of the plugin's own process.
+BACKENDS = frozenset({"process", "thread"})
+
+# The transaction rules that can be enabled with `rules=`. The event rule also covers Event directives.
+RULE_FAMILIES = frozenset({"opening_balance", "transfer", "owed", "receipt", "payslip", "event"})
+
+
+class TransactionsConfig(NamedTuple):
+    document_cache: Path | None = None
+    document_concurrency: int = 1
+    document_timeout: float | None = None
+    validation_cache: Path | None = None
+    workers: int = 1
+    instrumentation: str | None = None
+    profile: frozenset[str] = frozenset()
+    profile_dir: Path = Path()
+    error_cap: int | None = None
+    rules: frozenset[str] = RULE_FAMILIES
+    documents: bool = True
+    backend: str = "process"
+    fail_fast: int | None = None
+    since: dt.date | None = None
+    party: tuple[str, ...] | None = None
+    changed_files: ChangedFiles | None = None
+    # The ledger's files selected by `changed_files`, once resolved against the ledger being validated.
+    files: frozenset[str] | None = None
+
+    @property
+    def scope(self) -> ValidationScope | None:
+        """The part of the ledger selected by `since`, `party` and `files`, or None when it is validated in full."""
+        if self.since is None and self.party is None and self.files is None:
+            return None
+        parties = frozenset(self.party) if self.party is not None else None
+        return ValidationScope(self.since, parties, self.files)
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        msg = f"expected a positive integer, got {value}"
+        raise ValueError(msg)
+    return number
+
+
+def positive_float(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        msg = f"expected a positive number, got {value}"
+        raise ValueError(msg)
+    return number
+
+
+def iso_date(value: str) -> dt.date:
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        msg = f"expected a date as YYYY-MM-DD, got {value!r}"
+        raise ValueError(msg) from None
+
+
+def party_names(value: str) -> tuple[str, ...]:
+    """Parse a comma-separated list of parties, in the order given."""
+    parties = tuple(party.strip() for party in value.split(",") if party.strip())
+    if not parties:
+        msg = f"expected a comma-separated list of parties, got {value!r}"
+        raise ValueError(msg)
+    return parties
+
+
+def rule_families(value: str) -> frozenset[str]:
+    """Parse a comma-separated list of rule families. An empty list disables every rule."""
+    families = frozenset(family.strip() for family in value.split(",") if family.strip())
+    if not families <= RULE_FAMILIES:
+        msg = f"expected a comma-separated list of {', '.join(sorted(RULE_FAMILIES))}, got {value!r}"
+        raise ValueError(msg)
+    return families
+
+
+def switch(value: str) -> bool:
+    if value not in {"on", "off"}:
+        msg = f"expected on or off, got {value!r}"
+        raise ValueError(msg)
+    return value == "on"
+
+
+def backend(value: str) -> str:
+    if value not in BACKENDS:
+        msg = f"expected one of {', '.join(sorted(BACKENDS))}, got {value!r}"
+        raise ValueError(msg)
+    return value
+
+
+CONFIG_PARSERS: dict[str, Callable[[str], object]] = {
+    "document_cache": Path,
+    "document_concurrency": positive_int,
+    "document_timeout": positive_float,
+    "validation_cache": Path,
+    "workers": positive_int,
+    "instrumentation": str,
+    "profile": profile_modes,
+    "profile_dir": Path,
+    "error_cap": positive_int,
+    "rules": rule_families,
+    "documents": switch,
+    "backend": backend,
+    "fail_fast": positive_int,
+    "since": iso_date,
+    "party": party_names,
+    "changed_files": changed_files,
+}
+
+
+def parse_options(
+    config: str | None, parsers: Mapping[str, Callable[[str], object]]
+) -> tuple[dict[str, object], list[PluginConfigError]]:
+    """
+    Parse a plugin config string of `key=value` options separated by semicolons, using a parser per key.
+
+    Unknown or malformed options are reported as errors and otherwise ignored.
+    """
+    options: dict[str, object] = {}
+    errors: list[PluginConfigError] = []
+
+    for raw_option in (config or "").split(";"):
+        option = raw_option.strip()
+        if not option:
+            continue
+        key, separator, value = (part.strip() for part in option.partition("="))
+        if not separator or key not in parsers:
+            errors.append(PluginConfigError(None, INVALID_OPTION, None, option))
+            continue
+        try:
+            options[key] = parsers[key](value)
+        except ValueError as exc:
+            errors.append(PluginConfigError(None, INVALID_OPTION_VALUE, None, key, str(exc)))
+
+    return options, errors
+
+
+def parse_config(config: str | None) -> tuple[TransactionsConfig, list[PluginConfigError]]:
+    options, errors = parse_options(config, CONFIG_PARSERS)
+    fail_fast = os.environ.get(FAIL_FAST_ENV_VAR)
+    if fail_fast and "fail_fast" not in options:
+        try:
+            options["fail_fast"] = positive_int(fail_fast)
+        except ValueError as exc:
+            errors.append(PluginConfigError(None, INVALID_ENV_VAR_VALUE, None, FAIL_FAST_ENV_VAR, str(exc)))
+    return TransactionsConfig(**options), errors
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from beancount.core import data
+
+    from .document_resolver import DocumentResolver
+    from .events import EventRegistry
+    from .features import TransactionFeatures
+    from .journal import JournalFile
+
+
+class RuleTriggers(NamedTuple):
+    """
+    Cheap necessary conditions for a transaction rule to apply.
+
+    A rule is a candidate for a transaction when any one of its triggers is present. The rule's own predicate
+    still decides whether it applies, so triggers may over-approximate but must never miss a match.
+    """
+
+    tags: frozenset[str] = frozenset()
+    tag_prefixes: tuple[str, ...] = ()
+    meta_keys: frozenset[str] = frozenset()
+    posting_meta_keys: frozenset[str] = frozenset()
+    account_components: frozenset[str] = frozenset()
+    other_party: bool = False
+
+
+class RuleIndex:
+    """
+    Lookup tables mapping transaction features to the rules they can trigger.
+
+    Rules are identified by their position in the sequence the index was built from, and `match` returns them
+    as a bitmask so callers can keep a fixed evaluation order.
+    """
+
+    def __init__(self, rules: Sequence[RuleTriggers]) -> None:
+        self.tag_masks: dict[str, int] = {}
+        self.prefix_masks: list[tuple[str, int]] = []
+        self.meta_key_masks: dict[str, int] = {}
+        self.posting_meta_key_masks: dict[str, int] = {}
+        self.component_masks: dict[str, int] = {}
+        self.other_party_mask = 0
+
+        for position, triggers in enumerate(rules):
+            bit = 1 << position
+            for tag in triggers.tags:
+                self.tag_masks[tag] = self.tag_masks.get(tag, 0) | bit
+            self.prefix_masks.extend((prefix, bit) for prefix in triggers.tag_prefixes)
+            for key in triggers.meta_keys:
+                self.meta_key_masks[key] = self.meta_key_masks.get(key, 0) | bit
+            for key in triggers.posting_meta_keys:
+                self.posting_meta_key_masks[key] = self.posting_meta_key_masks.get(key, 0) | bit
+            for component in triggers.account_components:
+                self.component_masks[component] = self.component_masks.get(component, 0) | bit
+            if triggers.other_party:
+                self.other_party_mask |= bit
+
+        self.prefixes = tuple(prefix for prefix, _ in self.prefix_masks)
+
+    def _match_tags(self, tags: frozenset[str] | set[str]) -> int:
+        mask = 0
+        for tag in tags:
+            mask |= self.tag_masks.get(tag, 0)
+            if tag.startswith(self.prefixes):
+                for prefix, bit in self.prefix_masks:
+                    if tag.startswith(prefix):
+                        mask |= bit
+        return mask
+
+    def _match_features(self, features: TransactionFeatures, party: str) -> int:
+        mask = 0
+        for key, bit in self.posting_meta_key_masks.items():
+            if key in features.posting_meta_keys:
+                mask |= bit
+        for component in features.components:
+            mask |= self.component_masks.get(component, 0)
+        if self.other_party_mask and features.has_other_party(party):
+            mask |= self.other_party_mask
+        return mask
+
+    def match(self, entry: data.Transaction, features: TransactionFeatures, party: str) -> int:
+        """Return the bitmask of rules that may apply to `entry` in a journal belonging to `party`."""
+        mask = self._match_tags(entry.tags) if entry.tags else 0
+        for key, bit in self.meta_key_masks.items():
+            if key in entry.meta:
+                mask |= bit
+        return mask | self._match_features(features, party)
+
+
+class RuleContext(NamedTuple):
+    journal: JournalFile
+    events: EventRegistry
+    features: TransactionFeatures
+
+
+class TransactionRule(NamedTuple):
+    name: str
+    triggers: RuleTriggers
+    applies: Callable[[data.Transaction, RuleContext], bool]
+    validate: Callable[[data.Transaction, RuleContext], Sequence[object]]
+    needs_documents: bool = False
+
+
+class RuleSet(NamedTuple):
+    """Transaction rules in evaluation order, with the trigger index built from them."""
+
+    rules: tuple[TransactionRule, ...]
+    index: RuleIndex
+
+
+def build_rule_set(rules: Sequence[TransactionRule]) -> RuleSet:
+    return RuleSet(tuple(rules), RuleIndex([rule.triggers for rule in rules]))
+
+
+class EntryChecks(NamedTuple):
+    """
+    The checks a validation run applies to each kind of entry.
+
+    They are passed down as one value so a run can swap all of them for wrapped versions, e.g. to instrument them.
+    Event and document checks are None when disabled, and are then skipped along with the work that feeds them.
+    """
+
+    rule_set: RuleSet
+    first_posting_account: Callable[[data.Transaction, str], object | None]
+    balance_assertion: Callable[[data.Balance], Sequence[object]]
+    event: Callable[[data.Event, EventRegistry], Sequence[object]] | None
+    documents: (
+        Callable[[data.Balance | data.Transaction, DocumentResolver], tuple[Sequence[data.Document], Sequence[object]]]
+        | None
+    )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+CACHE_VERSION = 1
+
+
+class DirectoryIndex(NamedTuple):
+    mtime_ns: int
+    files: frozenset[str]
+    symlinks: frozenset[str]
+
+
+def list_directory(directory: Path) -> DirectoryIndex | None:
+    """List `directory` once with scandir. Return None if it cannot be read."""
+    try:
+        mtime_ns = directory.stat().st_mtime_ns
+        files: set[str] = set()
+        symlinks: set[str] = set()
+        with os.scandir(directory) as it:
+            for dir_entry in it:
+                if dir_entry.is_symlink():
+                    symlinks.add(dir_entry.name)
+                elif dir_entry.is_file(follow_symlinks=False):
+                    files.add(dir_entry.name)
+    except OSError:
+        return None
+    return DirectoryIndex(mtime_ns, frozenset(files), frozenset(symlinks))
+
+
+class DocumentResolver:
+    """
+    Resolve document paths and answer whether they exist from one listing per directory.
+
+    Paths are resolved against the working directory like `Path.resolve()`. Each referenced directory is
+    resolved and listed once; symlinked documents fall back to resolving the link itself. When `cache_path`
+    is given, listings are persisted there and reused on the next run while the directory's mtime is unchanged.
+    """
+
+    def __init__(self, cache_path: Path | None = None) -> None:
+        self.cwd = Path.cwd()
+        self.cache_path = cache_path
+        self.directories: dict[str, tuple[Path, DirectoryIndex | None]] = {}
+        self.timed_out: set[str] = set()
+        self.persisted: dict[str, DirectoryIndex] = self._load() if cache_path else {}
+        self.dirty = False
+
+    def _load(self) -> dict[str, DirectoryIndex]:
+        try:
+            text = self.cache_path.read_text()
+        except OSError:
+            return {}
+        try:
+            cache = json.loads(text)
+        except ValueError:
+            return {}
+        if cache.get("version") != CACHE_VERSION:
+            return {}
+        return {
+            directory: DirectoryIndex(listing["mtime_ns"], frozenset(listing["files"]), frozenset(listing["symlinks"]))
+            for directory, listing in cache["directories"].items()
+        }
+
+    def save(self) -> None:
+        """Persist the listings to `cache_path`, if one was given and anything changed."""
+        if self.cache_path is None or not self.dirty:
+            return
+        directories = dict(self.persisted)
+        directories.update({str(resolved): index for resolved, index in self.directories.values() if index is not None})
+        cache = {
+            "version": CACHE_VERSION,
+            "directories": {
+                directory: {
+                    "mtime_ns": index.mtime_ns,
+                    "files": sorted(index.files),
+                    "symlinks": sorted(index.symlinks),
+                }
+                for directory, index in sorted(directories.items())
+            },
+        }
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(json.dumps(cache))
+        self.dirty = False
+
+    def lookup_directory(self, directory: str) -> tuple[Path, DirectoryIndex | None, bool]:
+        """
+        Resolve and index `directory` without touching the resolver's state, so it can run in a worker thread.
+
+        Return the resolved directory, its index (None if unreadable) and whether the index was freshly listed.
+        """
+        resolved = (self.cwd / directory).resolve()
+        index = self.persisted.get(str(resolved))
+        if index is not None:
+            try:
+                if resolved.stat().st_mtime_ns == index.mtime_ns:
+                    return resolved, index, False
+            except OSError:
+                pass
+        return resolved, list_directory(resolved), True
+
+    def store_directory(self, directory: str, lookup: tuple[Path, DirectoryIndex | None, bool]) -> None:
+        resolved, index, fresh = lookup
+        self.directories[directory] = (resolved, index)
+        self.dirty = self.dirty or fresh
+
+    def mark_timed_out(self, directory: str) -> None:
+        self.timed_out.add(directory)
+
+    def resolve(self, filename: str) -> tuple[str, bool | None]:
+        """
+        Return the resolved path of `filename` and whether it is an existing file.
+
+        Existence is None when the file's directory could not be checked before its timeout.
+        """
+        directory, name = os.path.split(filename)
+        directory = directory or "."
+        if directory in self.timed_out:
+            return str(self.cwd / filename), None
+        if directory not in self.directories:
+            self.store_directory(directory, self.lookup_directory(directory))
+        resolved_directory, index = self.directories[directory]
+
+        if index is not None and name in index.symlinks:
+            full_filepath = (resolved_directory / name).resolve()
+            return str(full_filepath), full_filepath.is_file()
+
+        full_filepath = resolved_directory / name
+        if name in {"", ".", ".."}:
+            full_filepath = full_filepath.resolve()
+        return str(full_filepath), index is not None and name in index.files
+
+
+class UncheckedResolver:
+    """Resolve document paths to the same paths as a `DocumentResolver`, without checking that the documents exist."""
+
+    def __init__(self) -> None:
+        self.cwd = Path.cwd()
+        self.directories: dict[str, Path] = {}
+
+    def resolve(self, filename: str) -> tuple[str, bool | None]:
+        directory, name = os.path.split(filename)
+        directory = directory or "."
+        resolved_directory = self.directories.get(directory)
+        if resolved_directory is None:
+            resolved_directory = self.directories[directory] = (self.cwd / directory).resolve()
+        full_filepath = resolved_directory / name
+        if name in {"", ".", ".."} or full_filepath.is_symlink():
+            full_filepath = full_filepath.resolve()
+        return str(full_filepath), True
+
+
+def _run_in_daemon_thread[T](loop: asyncio.AbstractEventLoop, func: Callable[[str], T], arg: str) -> asyncio.Future[T]:
+    """
+    Run `func(arg)` on a daemon thread and return a future of its result.
+
+    A listing stuck on unresponsive storage cannot be interrupted. The interpreter joins executor threads when it
+    exits, but not daemon threads, so a stuck listing neither delays the validation nor keeps the process alive.
+    """
+    future: asyncio.Future[T] = loop.create_future()
+
+    def settle(result: T | None, error: Exception | None) -> None:
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def run() -> None:
+        result, error = None, None
+        try:
+            result = func(arg)
+        except Exception as exc:  # noqa: BLE001 - re-raised by whoever awaits the future
+            error = exc
+        # The loop is closed once every listing has finished or timed out.
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(settle, result, error)
+
+    threading.Thread(target=run, name="document-check", daemon=True).start()
+    return future
+
+
+async def _prefetch(
+    resolver: DocumentResolver, directories: Iterable[str], concurrency: int, directory_timeout: float | None
+) -> None:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(directory: str) -> None:
+        async with semaphore:
+            try:
+                lookup = await asyncio.wait_for(
+                    _run_in_daemon_thread(loop, resolver.lookup_directory, directory), directory_timeout
+                )
+            except TimeoutError:
+                resolver.mark_timed_out(directory)
+            else:
+                resolver.store_directory(directory, lookup)
+
+    await asyncio.gather(*(fetch(directory) for directory in directories))
+
+
+def prefetch_directories(
+    resolver: DocumentResolver, filenames: Iterable[str], concurrency: int, timeout: float | None
+) -> None:
+    """
+    Resolve and list the directories of `filenames` concurrently, at most `concurrency` at a time.
+
+    A directory that takes longer than `timeout` seconds is marked as timed out. Lookups complete in any
+    order, but results are stored by directory, so later calls to `resolve` are deterministic. When called
+    from inside a running event loop nothing is prefetched and directories are listed on first use instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        return
+
+    directories = dict.fromkeys(os.path.split(filename)[0] or "." for filename in filenames)
+    pending = [directory for directory in directories if directory not in resolver.directories]
+    if pending:
+        asyncio.run(_prefetch(resolver, pending, concurrency, timeout))
@@ -1,84 +1,159 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, NamedTuple
+from typing import TYPE_CHECKING, ClassVar
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from beancount.core import data
 
+# Message templates by id. A template is registered once, when the module raising it is imported.
+_TEMPLATES: list[str] = []
+_TEMPLATE_IDS: dict[str, int] = {}
+
+
+def message_template(template: str) -> int:
+    """Intern a `str.format` message template and return its id."""
+    template_id = _TEMPLATE_IDS.get(template)
+    if template_id is None:
+        template_id = _TEMPLATE_IDS[template] = len(_TEMPLATES)
+        _TEMPLATES.append(template)
+    return template_id
+
+
+def _restore_error[E: ErrorRecord](
+    cls: type[E], source: data.Meta | None, template: str, entry: object, args: tuple[object, ...]
+) -> E:
+    return cls(source, message_template(template), entry, *args)
+
+
+class ErrorRecord:
+    """
+    A beancount error recorded as its rule code, an interned message template and the template's arguments.
+
+    It satisfies beancount's (source, message, entry) error protocol, but `message` is only formatted when read,
+    e.g. when beancount prints the error. Errors pickle by template text, not id, so ids never leave the process.
+    """
+
+    __slots__ = ("args", "entry", "source", "template_id")
+
+    # The rule or check the error comes from, named as in the `rules` option where it has one. `error_cap` groups
+    # errors by it.
+    code: ClassVar[str]
+
+    def __init__(
+        self, source: data.Meta | None, template_id: int, entry: data.Directive | data.Posting | None, *args: object
+    ) -> None:
+        self.source = source
+        self.template_id = template_id
+        self.entry = entry
+        self.args = args
+
+    @property
+    def message(self) -> str:
+        template = _TEMPLATES[self.template_id]
+        return template.format(*self.args) if self.args else template
+
+    def _replace(self, **changes: object) -> ErrorRecord:
+        source = changes.pop("source", self.source)
+        entry = changes.pop("entry", self.entry)
+        if changes:
+            msg = f"Got unexpected field names: {list(changes)!r}"
+            raise ValueError(msg)
+        return type(self)(source, self.template_id, entry, *self.args)
+
+    def __iter__(self) -> Iterator[object]:
+        return iter((self.source, self.message, self.entry))
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return (self.source, self.template_id, self.entry, self.args) == (
+            other.source,
+            other.template_id,
+            other.entry,
+            other.args,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return _restore_error, (type(self), self.source, _TEMPLATES[self.template_id], self.entry, self.args)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(source={self.source!r}, message={self.message!r}, entry={self.entry!r})"
+
+
+class JournalError(ErrorRecord):
+    __slots__ = ()
+    code = "journal"
+
+
+class OpeningBalanceTransactionError(ErrorRecord):
+    __slots__ = ()
+    code = "opening_balance"
+
 
-class JournalError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class MissingOpeningBalanceError(ErrorRecord):
+    __slots__ = ()
+    code = "opening_balance"
 
 
-class OpeningBalanceTransactionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class FirstPostingIsNotToSpecifiedAccountError(ErrorRecord):
+    __slots__ = ()
+    code = "first_posting_account"
 
 
-class MissingOpeningBalanceError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class PostingToAnotherPartyError(ErrorRecord):
+    __slots__ = ()
+    code = "owed"
 
 
-class FirstPostingIsNotToSpecifiedAccountError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class BalanceAssertionError(ErrorRecord):
+    __slots__ = ()
+    code = "balance_assertion"
 
 
-class PostingToAnotherPartyError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | data.Posting | None
+class TransferTransactionError(ErrorRecord):
+    __slots__ = ()
+    code = "transfer"
 
 
-class BalanceAssertionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class ReceiptTransactionError(ErrorRecord):
+    __slots__ = ()
+    code = "receipt"
 
 
-class TransferTransactionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | data.Posting | None
+class PayslipTransactionError(ErrorRecord):
+    __slots__ = ()
+    code = "payslip"
 
 
-class ReceiptTransactionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class OwedTransactionError(ErrorRecord):
+    __slots__ = ()
+    code = "owed"
 
 
-class PayslipTransactionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class DocumentFileNotFoundError(ErrorRecord):
+    __slots__ = ()
+    code = "documents"
 
 
-class OwedTransactionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class EventError(ErrorRecord):
+    __slots__ = ()
+    code = "event"
 
 
-class DocumentFileNotFoundError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class EventTransactionError(ErrorRecord):
+    __slots__ = ()
+    code = "event"
 
 
-class EventError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class PluginConfigError(ErrorRecord):
+    __slots__ = ()
+    code = "config"
 
 
-class EventTransactionError(NamedTuple):
-    source: data.Meta | None
-    message: str
-    entry: data.Directive | None
+class SuppressedErrorsSummary(ErrorRecord):
+    __slots__ = ()
+    code = "error_cap"
@@ -2,24 +2,39 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from beancount.core import data
+
 from .common import any_tag_starts_with
-from .errors import EventError, EventTransactionError
+from .dispatch import RuleTriggers
+from .errors import EventError, EventTransactionError, message_template
 
 if TYPE_CHECKING:
-    from beancount.core import data
+    from collections.abc import Container, Iterable
 
 SIMPLE_EVENT_TYPES = frozenset({"address", "employment", "relationship"})
 LINKED_EVENT_TYPES = frozenset({"trip", "work_trip"})
 ALL_EVENT_TYPES = SIMPLE_EVENT_TYPES | LINKED_EVENT_TYPES
 
+EVENT_TRIGGERS = RuleTriggers(tag_prefixes=("event-",))
+
+INVALID_EVENT_TYPE = message_template("Event type '{}' is invalid")
+MISSING_EVENT_ID = message_template("Missing 'id' field in meta")
+DUPLICATE_EVENT_ID = message_template("Duplicate event id")
+MULTIPLE_EVENT_TAGS = message_template("Cannot have multiple event tags")
+EVENT_NOT_FOUND = message_template("Linked event not found")
+
+# Linked events of the ledger by id, built before transactions are validated.
+type EventRegistry = dict[str, data.Event]
+
 
 def validate_event(entry: data.Event) -> list[EventError]:
     if entry.type not in ALL_EVENT_TYPES:
         return [
             EventError(
                 entry.meta,
-                f"Event type '{entry.type}' is invalid",
+                INVALID_EVENT_TYPE,
                 entry,
+                entry.type,
             )
         ]
     return []
@@ -29,11 +44,11 @@ def is_linked_event(entry: data.Event) -> bool:
     return entry.type in LINKED_EVENT_TYPES
 
 
-def get_event_id(entry: data.Event, event_ids: list[str]) -> tuple[str | None, EventError | None]:
+def get_event_id(entry: data.Event, event_ids: Container[str]) -> tuple[str | None, EventError | None]:
     if "id" not in entry.meta:
         return None, EventError(
             entry.meta,
-            "Missing 'id' field in meta",
+            MISSING_EVENT_ID,
             entry,
         )
 
@@ -42,7 +57,7 @@ def get_event_id(entry: data.Event, event_ids: list[str]) -> tuple[str | None, E
     if event_id in event_ids:
         return event_id, EventError(
             entry.meta,
-            "Duplicate event id",
+            DUPLICATE_EVENT_ID,
             entry,
         )
 
@@ -53,14 +68,31 @@ def is_event_transaction(entry: data.Transaction) -> bool:
     return any_tag_starts_with(entry.tags, "event-")
 
 
-def validate_event_transaction(entry: data.Transaction, event_ids: list[str]) -> list[EventTransactionError]:
+def linked_event_id(entry: data.Transaction) -> str | None:
+    """Return the id of the event `entry` is linked to, or None unless it has exactly one event tag."""
+    event_tags = [tag for tag in entry.tags if tag.startswith("event-")]
+    return event_tags[0].removeprefix("event-") if len(event_tags) == 1 else None
+
+
+def event_references(entries: Iterable[data.Directive]) -> frozenset[str]:
+    """Return the ids of the events the transactions of `entries` are tagged with."""
+    return frozenset(
+        tag.removeprefix("event-")
+        for entry in entries
+        if isinstance(entry, data.Transaction)
+        for tag in entry.tags
+        if tag.startswith("event-")
+    )
+
+
+def validate_event_transaction(entry: data.Transaction, event_ids: Container[str]) -> list[EventTransactionError]:
     event_tags = [tag for tag in entry.tags if tag.startswith("event-")]
 
     if len(event_tags) > 1:
         return [
             EventTransactionError(
                 entry.meta,
-                "Cannot have multiple event tags",
+                MULTIPLE_EVENT_TAGS,
                 entry,
             )
         ]
@@ -71,7 +103,7 @@ def validate_event_transaction(entry: data.Transaction, event_ids: list[str]) ->
         return [
             EventTransactionError(
                 entry.meta,
-                "Linked event not found",
+                EVENT_NOT_FOUND,
                 entry,
             )
         ]
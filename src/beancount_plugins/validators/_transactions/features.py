@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, NamedTuple
+
+from beancount.core import account as core_account
+
+if TYPE_CHECKING:
+    from beancount.core import data
+
+
+class TransactionFeatures(NamedTuple):
+    """What the postings of a transaction touch, gathered in a single walk and shared by every rule."""
+
+    parties: frozenset[str]
+    roots: frozenset[str]
+    components: frozenset[str]
+    account_prefixes: frozenset[str]
+    posting_meta_keys: frozenset[str]
+
+    def has_other_party(self, party: str) -> bool:
+        return len(self.parties) > 1 or party not in self.parties
+
+
+@functools.cache
+def _account_features(
+    accounts: tuple[str, ...],
+) -> tuple[frozenset[str], frozenset[str], frozenset[str], frozenset[str]]:
+    """
+    Return (parties, roots, components, account_prefixes) for a combination of posting accounts.
+
+    The account prefixes are the accounts themselves and all their parents, e.g. `Expenses` and `Expenses:Food` for
+    `Expenses:Food`.
+    """
+    account_splits = [core_account.split(account) for account in accounts]
+    return (
+        frozenset(account_split[1] for account_split in account_splits),
+        frozenset(account_split[0] for account_split in account_splits),
+        frozenset(component for account_split in account_splits for component in account_split),
+        frozenset(
+            core_account.join(*account_split[:length])
+            for account_split in account_splits
+            for length in range(1, len(account_split) + 1)
+        ),
+    )
+
+
+def extract_features(entry: data.Transaction) -> TransactionFeatures:
+    # Ledgers reuse a small set of account combinations, so only the posting meta is gathered per transaction.
+    postings = entry.postings
+    parties, roots, components, account_prefixes = _account_features(tuple([posting.account for posting in postings]))
+    posting_meta_keys = frozenset().union(*[posting.meta for posting in postings if posting.meta])
+    return TransactionFeatures(parties, roots, components, account_prefixes, posting_meta_keys)
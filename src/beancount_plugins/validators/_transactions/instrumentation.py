@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .dispatch import EntryChecks, TransactionRule, build_rule_set
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+INSTRUMENTATION_ENV_VAR = "BEANCOUNT_PLUGINS_INSTRUMENTATION"
+
+# Report to standard error rather than to a file.
+STDERR_DESTINATION = "-"
+
+
+def instrumentation_destination(configured: str | None) -> str | None:
+    """Return where to report instrumentation: the plugin config option, else the environment variable."""
+    return configured or os.environ.get(INSTRUMENTATION_ENV_VAR) or None
+
+
+class CheckStats:
+    """
+    Counters for one check.
+
+    `matches` counts predicate calls that returned true, and calls of other checks that reported any error.
+    """
+
+    __slots__ = ("calls", "errors", "matches", "seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.matches = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+
+def _count_predicate(result: object) -> int | None:
+    return None if result else 0
+
+
+def _count_errors(errors: Sequence[object]) -> int:
+    return len(errors)
+
+
+def _count_optional_error(err: object | None) -> int:
+    return 0 if err is None else 1
+
+
+def _count_document_errors(result: tuple[Sequence[object], Sequence[object]]) -> int:
+    return len(result[1])
+
+
+class Instrumentation:
+    """Call counts, matches, errors and wall time of every check in a validation run, keyed by check name."""
+
+    def __init__(self) -> None:
+        self.stats: dict[str, CheckStats] = {}
+
+    def wrap[**P, R](self, name: str, func: Callable[P, R], count: Callable[[R], int | None]) -> Callable[P, R]:
+        """
+        Wrap `func` to record its calls under `name`.
+
+        `count` returns the number of errors in a result, or None for a predicate result that counts as a match.
+        """
+        stats = self.stats.setdefault(name, CheckStats())
+
+        @functools.wraps(func)
+        def instrumented(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                stats.seconds += time.perf_counter() - start
+                stats.calls += 1
+            errors = count(result)
+            if errors is None:
+                stats.matches += 1
+            elif errors:
+                stats.matches += 1
+                stats.errors += errors
+            return result
+
+        return instrumented
+
+    def wrap_rule(self, rule: TransactionRule) -> TransactionRule:
+        return rule._replace(
+            applies=self.wrap(f"rule:{rule.name}:applies", rule.applies, _count_predicate),
+            validate=self.wrap(f"rule:{rule.name}:validate", rule.validate, _count_errors),
+        )
+
+    def instrument(self, checks: EntryChecks) -> EntryChecks:
+        """Return `checks` with every rule predicate, rule validator and per-entry check wrapped."""
+        return EntryChecks(
+            build_rule_set([self.wrap_rule(rule) for rule in checks.rule_set.rules]),
+            self.wrap("first_posting_account", checks.first_posting_account, _count_optional_error),
+            self.wrap("balance_assertion", checks.balance_assertion, _count_errors),
+            self.wrap("event", checks.event, _count_errors) if checks.event else None,
+            self.wrap("documents", checks.documents, _count_document_errors) if checks.documents else None,
+        )
+
+    def report(self) -> list[dict[str, object]]:
+        """Return the stats of every check that was called, slowest first."""
+        rows = [
+            {"check": name, "calls": s.calls, "matches": s.matches, "errors": s.errors, "seconds": s.seconds}
+            for name, s in self.stats.items()
+            if s.calls
+        ]
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def format_table(self) -> str:
+        lines = [f"{'check':<32}{'calls':>10}{'matches':>10}{'errors':>10}{'seconds':>10}"]
+        lines.extend(
+            f"{row['check']:<32}{row['calls']:>10}{row['matches']:>10}{row['errors']:>10}{row['seconds']:>10.3f}"
+            for row in self.report()
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, destination: str) -> None:
+        """Write the report to `destination`: JSON for a `.json` path, a table otherwise, or stderr for `-`."""
+        if destination == STDERR_DESTINATION:
+            sys.stderr.write(self.format_table())
+            return
+        path = Path(destination)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.report(), indent=2) + "\n")
+        else:
+            path.write_text(self.format_table())
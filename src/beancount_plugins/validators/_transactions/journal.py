@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import operator
+from typing import TYPE_CHECKING, NamedTuple
+
+from .transfer import TransferType, compile_transfer_types
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from beancount.core import data
+
+
+class JournalFile(NamedTuple):
+    """The party and account a journal file belongs to, with the rule tables compiled for that party."""
+
+    party: str
+    account: str
+    transfer_types: Mapping[str, TransferType]
+
+
+def initialise_journal_file(entry: data.Custom) -> JournalFile:
+    party = entry.values[0].value
+    return JournalFile(party, entry.values[1].value, compile_transfer_types(party))
+
+
+class JournalResult(NamedTuple):
+    """
+    Validation output for a sequence of entries, with positions relative to that sequence.
+
+    `errors` holds (position, posting index, error) triples. The posting index is None unless the error was raised
+    on one of the entry's postings, so the error can be bound to the same posting of another copy of the entries.
+
+    `dropped_statements` lists the Balance entries whose future-dated statement meta was removed, so the removal
+    can be replayed on entries that were not validated in this process. `unchecked_documents` lists the entries out of
+    the validation scope, whose documents are linked without checking that they exist.
+    """
+
+    errors: list[tuple[int, int | None, object]]
+    document_positions: list[int]
+    dropped_statements: list[int]
+    unchecked_documents: list[int]
+
+
+def merge_journal_results(results: Iterable[tuple[Sequence[int], JournalResult]]) -> JournalResult:
+    """Combine per-file results into one, in the order of the full entries list they were taken from."""
+    merged = JournalResult([], [], [], [])
+    for positions, result in results:
+        merged.errors.extend((positions[position], posting, err) for position, posting, err in result.errors)
+        merged.document_positions.extend(positions[position] for position in result.document_positions)
+        merged.dropped_statements.extend(positions[position] for position in result.dropped_statements)
+        merged.unchecked_documents.extend(positions[position] for position in result.unchecked_documents)
+    # Stable, so errors raised by the same entry keep their order.
+    merged.errors.sort(key=operator.itemgetter(0))
+    merged.document_positions.sort()
+    merged.dropped_statements.sort()
+    merged.unchecked_documents.sort()
+    return merged
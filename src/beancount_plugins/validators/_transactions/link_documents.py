@@ -1,35 +1,63 @@
-from pathlib import Path
+from __future__ import annotations
+
+import bisect
+from typing import TYPE_CHECKING
 
 from beancount.core import data
 
-from .common import any_posting_has_metadata_key
-from .errors import DocumentFileNotFoundError
+from .errors import DocumentFileNotFoundError, message_template
+
+if TYPE_CHECKING:
+    from .document_resolver import DocumentResolver
+
+FILE_CHECK_TIMED_OUT = message_template("Timed out checking file: {}")
+FILE_NOT_FOUND = message_template("File not found: {}")
 
 
 def get_full_filepath(
-    entry: data.Balance | data.Transaction, filename: str
+    entry: data.Balance | data.Transaction, filename: str, resolver: DocumentResolver
 ) -> tuple[str, DocumentFileNotFoundError | None]:
-    full_filepath = (Path.cwd() / filename).resolve()
+    full_filepath, exists = resolver.resolve(filename)
     err = None
 
-    if not full_filepath.is_file():
+    if exists is None:
+        err = DocumentFileNotFoundError(
+            entry.meta,
+            FILE_CHECK_TIMED_OUT,
+            entry,
+            full_filepath,
+        )
+    elif not exists:
         err = DocumentFileNotFoundError(
             entry.meta,
-            f"File not found: {full_filepath}",
+            FILE_NOT_FOUND,
             entry,
+            full_filepath,
         )
 
-    return str(full_filepath), err
+    return full_filepath, err
+
+
+def document_filenames(entry: data.Balance | data.Transaction) -> list[str]:
+    """Return the document paths `create_document_entries` will check for `entry`, in the same order."""
+    filenames: list[str] = []
+    if "statement" in entry.meta and isinstance(entry, data.Balance):
+        filenames.append(entry.meta["statement"])
+    if "payslip" in entry.meta and isinstance(entry, data.Transaction) and len(entry.postings) > 1:
+        filenames.append(entry.meta["payslip"])
+    if isinstance(entry, data.Transaction):
+        filenames.extend(posting.meta["receipt"] for posting in entry.postings if "receipt" in posting.meta)
+    return filenames
 
 
 def create_document_entries(
-    entry: data.Balance | data.Transaction,
+    entry: data.Balance | data.Transaction, resolver: DocumentResolver
 ) -> tuple[list[data.Document], list[DocumentFileNotFoundError]]:
     errors: list[DocumentFileNotFoundError] = []
     document_entries: list[data.Document] = []
 
     if "statement" in entry.meta and isinstance(entry, data.Balance):
-        full_filepath, err = get_full_filepath(entry, entry.meta["statement"])
+        full_filepath, err = get_full_filepath(entry, entry.meta["statement"], resolver)
         if err:
             errors.append(err)
 
@@ -47,7 +75,7 @@ def create_document_entries(
             )
         )
     if "payslip" in entry.meta and isinstance(entry, data.Transaction) and len(entry.postings) > 1:
-        full_filepath, err = get_full_filepath(entry, entry.meta["payslip"])
+        full_filepath, err = get_full_filepath(entry, entry.meta["payslip"], resolver)
         if err:
             errors.append(err)
 
@@ -64,10 +92,10 @@ def create_document_entries(
                 links=set(),
             )
         )
-    if isinstance(entry, data.Transaction) and any_posting_has_metadata_key(entry.postings, "receipt"):
+    if isinstance(entry, data.Transaction):
         for posting in entry.postings:
             if "receipt" in posting.meta:
-                full_filepath, err = get_full_filepath(entry, posting.meta["receipt"])
+                full_filepath, err = get_full_filepath(entry, posting.meta["receipt"], resolver)
                 if err:
                     errors.append(err)
 
@@ -86,3 +114,23 @@ def create_document_entries(
                 )
 
     return document_entries, errors
+
+
+def merge_documents(entries: data.Entries, document_entries: list[data.Document]) -> data.Entries:
+    """
+    Merge `document_entries` into the sorted `entries`, in the order a stable sort of both by entry sort key gives.
+
+    The documents are sorted among themselves and placed with a binary search each, so the ledger is copied once
+    instead of being re-sorted.
+    """
+    if not document_entries:
+        return entries
+    merged: data.Entries = []
+    start = 0
+    for document in sorted(document_entries, key=data.entry_sortkey):
+        end = bisect.bisect_right(entries, data.entry_sortkey(document), lo=start, key=data.entry_sortkey)
+        merged.extend(entries[start:end])
+        merged.append(document)
+        start = end
+    merged.extend(entries[start:])
+    return merged
@@ -1,10 +1,20 @@
 from beancount.core import account as core_account
 from beancount.core import data
 
-from .errors import OpeningBalanceTransactionError
+from .dispatch import RuleTriggers
+from .errors import OpeningBalanceTransactionError, message_template
 
 EXPECTED_POSTINGS = 2
 
+EXACTLY_ONE_TAG = message_template("Journal opening balance transaction must have exactly one tag")
+EXACTLY_TWO_POSTINGS = message_template("Journal opening balance transaction must have exactly two postings")
+SECOND_POSTING_NOT_EQUITY = message_template("Equity account must be the second posting")
+SECOND_POSTING_NOT_OPENING_BALANCES = message_template(
+    "Second posting account must have a component of OpeningBalances"
+)
+
+OPENING_BALANCE_TRIGGERS = RuleTriggers(tags=frozenset({"journal-opening-balance"}))
+
 
 def is_opening_balance_transaction(entry: data.Transaction) -> bool:
     return "journal-opening-balance" in entry.tags
@@ -17,7 +27,7 @@ def validate_opening_balance_transaction(entry: data.Transaction) -> list[Openin
         errors.append(
             OpeningBalanceTransactionError(
                 entry.meta,
-                "Journal opening balance transaction must have exactly one tag",
+                EXACTLY_ONE_TAG,
                 entry,
             )
         )
@@ -25,7 +35,7 @@ def validate_opening_balance_transaction(entry: data.Transaction) -> list[Openin
         errors.append(
             OpeningBalanceTransactionError(
                 entry.meta,
-                "Journal opening balance transaction must have exactly two postings",
+                EXACTLY_TWO_POSTINGS,
                 entry,
             )
         )
@@ -35,7 +45,7 @@ def validate_opening_balance_transaction(entry: data.Transaction) -> list[Openin
         errors.append(
             OpeningBalanceTransactionError(
                 entry.meta,
-                "Equity account must be the second posting",
+                SECOND_POSTING_NOT_EQUITY,
                 entry,
             )
         )
@@ -43,7 +53,7 @@ def validate_opening_balance_transaction(entry: data.Transaction) -> list[Openin
         errors.append(
             OpeningBalanceTransactionError(
                 entry.meta,
-                "Second posting account must have a component of OpeningBalances",
+                SECOND_POSTING_NOT_OPENING_BALANCES,
                 entry,
             )
         )
@@ -1,54 +1,67 @@
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple
+
 from beancount.core import account as core_account
 from beancount.core import data
 
 from .common import any_tag_starts_with
-from .errors import OwedTransactionError, PostingToAnotherPartyError
+from .dispatch import RuleTriggers
+from .errors import OwedTransactionError, PostingToAnotherPartyError, message_template
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .features import TransactionFeatures
+
+OWED_TRIGGERS = RuleTriggers(tag_prefixes=("owed",), other_party=True)
+
+INVALID_OWED_TAG = message_template("Invalid owed tag: {}")
+OWED_BY_SELF = message_template("Owed tag must be for another party")
+MISSING_OWED_ACCOUNT = message_template("Expected at least one posting to an account starting with: {}")
+POSTING_TO_ANOTHER_PARTY = message_template(
+    "Posting to an account that does not belong to the party: {}, or to any of the owed parties' allowed accounts: "
+    "{}. If this was intentional, please use the appropriate tags."
+)
+
 
+class OwedType(NamedTuple):
+    extra_allowed_account_prefixes: tuple[str, ...]
+    tags: tuple[str, ...]
 
-def any_posting_has_different_party(postings: list[data.Posting], party: str) -> bool:
-    return any(core_account.split(posting.account)[1] != party for posting in postings)
+
+OWED_TYPES: Mapping[str, OwedType] = MappingProxyType(
+    {
+        "owed-by-francis": OwedType(("Expenses:Francis", "Assets:Francis:Receivables"), ("owed", "owed-by-francis")),
+        "owed-by-leyna": OwedType(("Expenses:Leyna", "Assets:Leyna:Receivables"), ("owed", "owed-by-leyna")),
+        "owed-by-shared": OwedType(("Expenses:Shared", "Assets:Shared:Receivables"), ("owed", "owed-by-shared")),
+        "owed-to-shared": OwedType(("Income:Shared:GiftsReceived",), ("owed", "owed-to-shared")),
+    }
+)
 
 
-def is_owed_transaction(entry: data.Transaction, party: str) -> bool:
+def is_owed_transaction(entry: data.Transaction, party: str, features: TransactionFeatures) -> bool:
     return any_tag_starts_with(entry.tags, "owed") or (
-        any_posting_has_different_party(entry.postings, party)
-        and not data.has_entry_account_component(entry, "Transfers")
+        features.has_other_party(party) and "Transfers" not in features.components
     )
 
 
 def validate_owed_transaction(
-    entry: data.Transaction, party: str
+    entry: data.Transaction, party: str, features: TransactionFeatures
 ) -> list[OwedTransactionError | PostingToAnotherPartyError]:
-    owed_types = {
-        "owed-by-francis": {
-            "extra_allowed_account_prefixes": ["Expenses:Francis", "Assets:Francis:Receivables"],
-            "tags": ["owed", "owed-by-francis"],
-        },
-        "owed-by-leyna": {
-            "extra_allowed_account_prefixes": ["Expenses:Leyna", "Assets:Leyna:Receivables"],
-            "tags": ["owed", "owed-by-leyna"],
-        },
-        "owed-by-shared": {
-            "extra_allowed_account_prefixes": ["Expenses:Shared", "Assets:Shared:Receivables"],
-            "tags": ["owed", "owed-by-shared"],
-        },
-        "owed-to-shared": {
-            "extra_allowed_account_prefixes": ["Income:Shared:GiftsReceived"],
-            "tags": ["owed", "owed-to-shared"],
-        },
-    }
-
     other_allowed_account_prefixes: list[str] = []
     errors: list[OwedTransactionError | PostingToAnotherPartyError] = []
 
     for tag in entry.tags:
         if tag.startswith("owed"):
-            if tag not in owed_types:
+            if tag not in OWED_TYPES:
                 return [
                     OwedTransactionError(
                         entry.meta,
-                        f"Invalid owed tag: {tag}",
+                        INVALID_OWED_TAG,
                         entry,
+                        tag,
                     )
                 ]
 
@@ -57,42 +70,34 @@ def validate_owed_transaction(
                 return [
                     OwedTransactionError(
                         entry.meta,
-                        "Owed tag must be for another party",
+                        OWED_BY_SELF,
                         entry,
                     )
                 ]
 
-            has_expected_account_with_prefix = False
-            for allowed_account_prefix in owed_types[tag]["extra_allowed_account_prefixes"]:
-                has_expected_account_with_prefix = has_expected_account_with_prefix or data.has_entry_account_component(
-                    entry, allowed_account_prefix
-                )
+            extra_allowed_account_prefixes = OWED_TYPES[tag].extra_allowed_account_prefixes
+            has_expected_account_with_prefix = not features.account_prefixes.isdisjoint(extra_allowed_account_prefixes)
 
             # Must have a posting to Expenses:OwedPart or Assets:OwedPart:Receivables
             if not has_expected_account_with_prefix:
                 errors.append(
                     OwedTransactionError(
                         entry.meta,
-                        f"Expected at least one posting to an account starting with: "
-                        f"{owed_types[tag]['extra_allowed_account_prefixes']}",
+                        MISSING_OWED_ACCOUNT,
                         entry,
+                        list(extra_allowed_account_prefixes),
                     )
                 )
 
-            other_allowed_account_prefixes = (
-                other_allowed_account_prefixes + owed_types[tag]["extra_allowed_account_prefixes"]
-            )
+            other_allowed_account_prefixes.extend(extra_allowed_account_prefixes)
 
+    allowed_prefixes = tuple(other_allowed_account_prefixes)
     for posting in entry.postings[1:]:
         account_split = core_account.split(posting.account)
         party_of_posting = account_split[1]
 
         posting_party_is_not_entry_party = party_of_posting != party
-        posting_account_is_not_expected = False
-        for allowed_account_prefix in other_allowed_account_prefixes:
-            posting_account_is_not_expected = posting_account_is_not_expected or posting.account.startswith(
-                allowed_account_prefix
-            )
+        posting_account_is_not_expected = posting.account.startswith(allowed_prefixes)
 
         # Cannot post to any account that does not belong to the party or to Expenses:OwedParties
         # or Assets:OwedParties:Receivables
@@ -100,11 +105,10 @@ def validate_owed_transaction(
             errors.append(
                 PostingToAnotherPartyError(
                     posting.meta,
-                    f"Posting to an account that does not belong to the party: {party}, "
-                    f"or to any of the owed parties' allowed accounts: "
-                    f"{other_allowed_account_prefixes}. "
-                    "If this was intentional, please use the appropriate tags.",
+                    POSTING_TO_ANOTHER_PARTY,
                     posting,
+                    party,
+                    other_allowed_account_prefixes,
                 )
             )
 
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from .errors import PayslipTransactionError
+from .dispatch import RuleTriggers
+from .errors import PayslipTransactionError, message_template
 
 if TYPE_CHECKING:
     from beancount.core import data
 
+PAYSLIP_TRIGGERS = RuleTriggers(tags=frozenset({"payslip"}), meta_keys=frozenset({"payslip"}))
+
+MISSING_PAYSLIP_TAG = message_template("Missing required tag of 'payslip'")
+MISSING_PAYSLIP_META = message_template("Missing required metadata of 'payslip'")
+WRONG_SALARY_ACCOUNT = message_template("Second posting account should be 'Income:{}:GrossPay:Salary'")
+
 
 def is_payslip_transaction(entry: data.Transaction) -> bool:
     return "payslip" in entry.tags or "payslip" in entry.meta
@@ -19,7 +26,7 @@ def validate_payslip_transaction(entry: data.Transaction, party: str) -> list[Pa
         errors.append(
             PayslipTransactionError(
                 entry.meta,
-                "Missing required tag of 'payslip'",
+                MISSING_PAYSLIP_TAG,
                 entry,
             )
         )
@@ -28,7 +35,7 @@ def validate_payslip_transaction(entry: data.Transaction, party: str) -> list[Pa
         errors.append(
             PayslipTransactionError(
                 entry.meta,
-                "Missing required metadata of 'payslip'",
+                MISSING_PAYSLIP_META,
                 entry,
             )
         )
@@ -37,8 +44,9 @@ def validate_payslip_transaction(entry: data.Transaction, party: str) -> list[Pa
         errors.append(
             PayslipTransactionError(
                 entry.meta,
-                f"Second posting account should be 'Income:{party}:GrossPay:Salary'",
+                WRONG_SALARY_ACCOUNT,
                 entry,
+                party,
             )
         )
 
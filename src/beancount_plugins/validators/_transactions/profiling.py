@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import datetime as dt
+import os
+import tracemalloc
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+PROFILE_MODES = frozenset({"cpu", "memory"})
+TOP_ALLOCATION_SITES = 25
+
+
+def profile_modes(value: str) -> frozenset[str]:
+    """Parse a comma-separated list of profile modes."""
+    modes = frozenset(mode.strip() for mode in value.split(",") if mode.strip())
+    if not modes or not modes <= PROFILE_MODES:
+        msg = f"expected a comma-separated list of {', '.join(sorted(PROFILE_MODES))}, got {value!r}"
+        raise ValueError(msg)
+    return modes
+
+
+def _output_stem(directory: Path, plugin: str) -> Path:
+    timestamp = dt.datetime.now(tz=dt.UTC).strftime("%Y%m%dT%H%M%S%fZ")
+    return directory / f"{plugin}-{timestamp}-{os.getpid()}"
+
+
+def _write_allocations(path: Path, snapshot: tracemalloc.Snapshot, peak: int) -> None:
+    lines = [f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB", "", f"Top {TOP_ALLOCATION_SITES} allocation sites:"]
+    lines.extend(str(statistic) for statistic in snapshot.statistics("lineno")[:TOP_ALLOCATION_SITES])
+    path.write_text("\n".join(lines) + "\n")
+
+
+@contextlib.contextmanager
+def profiled(plugin: str, modes: frozenset[str], directory: Path) -> Iterator[None]:
+    """
+    Profile the body with cProfile and/or trace its allocations with tracemalloc, as selected by `modes`.
+
+    Results are written to `directory` as `<plugin>-<timestamp>-<pid>.prof` (CPU) and
+    `<plugin>-<timestamp>-<pid>-allocations.txt` (peak memory and top allocation sites). Tracing that was already
+    started outside the plugin is left running.
+    """
+    if not modes:
+        yield
+        return
+
+    stem = _output_stem(directory, plugin)
+    trace_memory = "memory" in modes
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    profiler = cProfile.Profile() if "cpu" in modes else None
+
+    try:
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+        directory.mkdir(parents=True, exist_ok=True)
+        if profiler:
+            profiler.dump_stats(stem.with_name(f"{stem.name}.prof"))
+        if trace_memory:
+            _write_allocations(
+                stem.with_name(f"{stem.name}-allocations.txt"),
+                tracemalloc.take_snapshot(),
+                tracemalloc.get_traced_memory()[1],
+            )
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
@@ -2,34 +2,44 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from .common import any_posting_has_metadata_key
-from .errors import ReceiptTransactionError
+from .dispatch import RuleTriggers
+from .errors import ReceiptTransactionError, message_template
 
 if TYPE_CHECKING:
     from beancount.core import data
 
+    from .features import TransactionFeatures
 
-def is_receipt_transaction(entry: data.Transaction) -> bool:
-    return "valuables" in entry.tags or any_posting_has_metadata_key(entry.postings, "receipt")
+RECEIPT_TRIGGERS = RuleTriggers(tags=frozenset({"valuables"}), posting_meta_keys=frozenset({"receipt"}))
 
+MISSING_VALUABLES_TAG = message_template("Missing required tag of 'valuables'")
+MISSING_RECEIPT_META = message_template("Missing required metadata of 'receipt'")
+RECEIPT_NOT_TO_EXPENSES = message_template("Transactions with receipt metadata must be to an expense account")
 
-def validate_receipt_transaction(entry: data.Transaction) -> list[ReceiptTransactionError]:
+
+def is_receipt_transaction(entry: data.Transaction, features: TransactionFeatures) -> bool:
+    return "valuables" in entry.tags or "receipt" in features.posting_meta_keys
+
+
+def validate_receipt_transaction(
+    entry: data.Transaction, features: TransactionFeatures
+) -> list[ReceiptTransactionError]:
     errors: list[ReceiptTransactionError] = []
 
     if "valuables" not in entry.tags:
         errors.append(
             ReceiptTransactionError(
                 entry.meta,
-                "Missing required tag of 'valuables'",
+                MISSING_VALUABLES_TAG,
                 entry,
             )
         )
 
-    if not any_posting_has_metadata_key(entry.postings, "receipt"):
+    if "receipt" not in features.posting_meta_keys:
         errors.append(
             ReceiptTransactionError(
                 entry.meta,
-                "Missing required metadata of 'receipt'",
+                MISSING_RECEIPT_META,
                 entry,
             )
         )
@@ -37,7 +47,7 @@ def validate_receipt_transaction(entry: data.Transaction) -> list[ReceiptTransac
     errors.extend(
         ReceiptTransactionError(
             entry.meta,
-            "Transactions with receipt metadata must be to an expense account",
+            RECEIPT_NOT_TO_EXPENSES,
             entry,
         )
         for posting in entry.postings[1:]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+from .events import event_references
+
+if TYPE_CHECKING:
+    import datetime as dt
+
+    from beancount.core import data
+
+    from .events import EventRegistry
+    from .journal import JournalFile
+
+
+class ValidationScope(NamedTuple):
+    """
+    The part of the ledger to validate: entries dated on or after `since`, from `files`, in journals of `parties`.
+
+    None leaves that side unrestricted. Events are shared between parties, so they are not scoped by party, and a
+    transaction linked to an event defined in one of `files`, or to one no longer defined anywhere, is validated
+    whichever file it comes from, since the event may have been renamed or removed.
+    """
+
+    since: dt.date | None = None
+    parties: frozenset[str] | None = None
+    files: frozenset[str] | None = None
+
+    def includes_event(self, entry: data.Directive) -> bool:
+        return self.includes_date(entry) and (self.files is None or entry.meta["filename"] in self.files)
+
+    def includes(self, entry: data.Directive, journal: JournalFile | None, events: EventRegistry | None = None) -> bool:
+        """
+        Return whether `entry`, from the journal file described by `journal` if any, is in scope.
+
+        With `events`, the ledger's linked events, transactions linked to events of the files in scope are included.
+        """
+        if not self.includes_date(entry):
+            return False
+        if (
+            self.files is not None
+            and entry.meta["filename"] not in self.files
+            and (events is None or not self.links_event_in_files(entry, events))
+        ):
+            return False
+        return self.parties is None or (journal is not None and journal.party in self.parties)
+
+    def includes_date(self, entry: data.Directive) -> bool:
+        return self.since is None or entry.date >= self.since
+
+    def links_event_in_files(self, entry: data.Directive, events: EventRegistry) -> bool:
+        """Return whether `entry` is linked to an event defined in one of `files`, or to one defined nowhere."""
+        if self.files is None:
+            return False
+        for event_id in event_references((entry,)):
+            event = events.get(event_id)
+            if event is None or event.meta["filename"] in self.files:
+                return True
+        return False
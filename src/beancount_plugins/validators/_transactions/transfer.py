@@ -1,64 +1,79 @@
-from beancount.core import data
+from __future__ import annotations
+
+import functools
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple
 
 from .common import any_tag_starts_with
-from .errors import TransferTransactionError
+from .dispatch import RuleTriggers
+from .errors import TransferTransactionError, message_template
 
-EXPECTED_POSTINGS = 2
+if TYPE_CHECKING:
+    from collections.abc import Mapping
 
+    from beancount.core import data
 
-def is_transfer_transaction(entry: data.Transaction) -> bool:
-    return any_tag_starts_with(entry.tags, "transfer") or data.has_entry_account_component(entry, "Transfers")
-
-
-def validate_transfer_transaction(entry: data.Transaction, party: str) -> list[TransferTransactionError]:
-    transfer_types = {
-        "transfer-to-self": {
-            "payee": "Self",
-            "narration_prefix": "Transfer to self: ",
-            "account": f"Assets:{party}:Transfers:Self",
-        },
-        "transfer-to-francis": {
-            "payee": "Francis",
-            "narration_prefix": "Transfer to Francis: ",
-            "account": f"Assets:Francis:Transfers:From{party}",
-        },
-        "transfer-to-leyna": {
-            "payee": "Leyna",
-            "narration_prefix": "Transfer to Leyna: ",
-            "account": f"Assets:Leyna:Transfers:From{party}",
-        },
-        "transfer-to-shared": {
-            "payee": "Shared",
-            "narration_prefix": "Transfer to Shared: ",
-            "account": f"Assets:Shared:Transfers:From{party}",
-        },
-        "transfer-from-self": {
-            "payee": "Self",
-            "narration_prefix": "Transfer from self: ",
-            "account": f"Assets:{party}:Transfers:Self",
-        },
-        "transfer-from-francis": {
-            "payee": "Francis",
-            "narration_prefix": "Transfer from Francis: ",
-            "account": f"Assets:{party}:Transfers:FromFrancis",
-        },
-        "transfer-from-leyna": {
-            "payee": "Leyna",
-            "narration_prefix": "Transfer from Leyna: ",
-            "account": f"Assets:{party}:Transfers:FromLeyna",
-        },
-        "transfer-from-shared": {
-            "payee": "Shared",
-            "narration_prefix": "Transfer from Shared: ",
-            "account": f"Assets:{party}:Transfers:FromShared",
-        },
-    }
+    from .features import TransactionFeatures
+
+EXPECTED_POSTINGS = 2
 
+EXACTLY_ONE_TAG = message_template("Transfer transaction must have exactly one tag")
+INVALID_TAG = message_template("Invalid transfer tag: {}")
+WRONG_PAYEE = message_template("Payee must be {}")
+WRONG_NARRATION = message_template("Narration must start with {}")
+EXACTLY_TWO_POSTINGS = message_template("Transfer transaction must have exactly two postings")
+WRONG_SECOND_POSTING_ACCOUNT = message_template("Second posting must be to: {}")
+NEGATIVE_TRANSFER_FROM = message_template("First posting amount must be positive for transfer from")
+POSITIVE_TRANSFER_TO = message_template("First posting amount must be negative for transfer to")
+
+TRANSFER_TRIGGERS = RuleTriggers(tag_prefixes=("transfer",), account_components=frozenset({"Transfers"}))
+
+
+def is_transfer_transaction(entry: data.Transaction, features: TransactionFeatures) -> bool:
+    return any_tag_starts_with(entry.tags, "transfer") or "Transfers" in features.components
+
+
+class TransferType(NamedTuple):
+    payee: str
+    narration_prefix: str
+    account: str
+
+
+@functools.cache
+def compile_transfer_types(party: str) -> Mapping[str, TransferType]:
+    """Return the read-only transfer tag table for journals belonging to `party`, built once per party."""
+    return MappingProxyType(
+        {
+            "transfer-to-self": TransferType("Self", "Transfer to self: ", f"Assets:{party}:Transfers:Self"),
+            "transfer-to-francis": TransferType(
+                "Francis", "Transfer to Francis: ", f"Assets:Francis:Transfers:From{party}"
+            ),
+            "transfer-to-leyna": TransferType("Leyna", "Transfer to Leyna: ", f"Assets:Leyna:Transfers:From{party}"),
+            "transfer-to-shared": TransferType(
+                "Shared", "Transfer to Shared: ", f"Assets:Shared:Transfers:From{party}"
+            ),
+            "transfer-from-self": TransferType("Self", "Transfer from self: ", f"Assets:{party}:Transfers:Self"),
+            "transfer-from-francis": TransferType(
+                "Francis", "Transfer from Francis: ", f"Assets:{party}:Transfers:FromFrancis"
+            ),
+            "transfer-from-leyna": TransferType(
+                "Leyna", "Transfer from Leyna: ", f"Assets:{party}:Transfers:FromLeyna"
+            ),
+            "transfer-from-shared": TransferType(
+                "Shared", "Transfer from Shared: ", f"Assets:{party}:Transfers:FromShared"
+            ),
+        }
+    )
+
+
+def validate_transfer_transaction(
+    entry: data.Transaction, transfer_types: Mapping[str, TransferType]
+) -> list[TransferTransactionError]:
     if len(entry.tags) != 1:
         return [
             TransferTransactionError(
                 entry.meta,
-                "Transfer transaction must have exactly one tag",
+                EXACTLY_ONE_TAG,
                 entry,
             )
         ]
@@ -68,29 +83,32 @@ def validate_transfer_transaction(entry: data.Transaction, party: str) -> list[T
         return [
             TransferTransactionError(
                 entry.meta,
-                f"Invalid transfer tag: {type_key}",
+                INVALID_TAG,
                 entry,
+                type_key,
             )
         ]
 
     transfer_type = transfer_types[type_key]
     errors: list[TransferTransactionError] = []
 
-    if entry.payee != transfer_type["payee"]:
+    if entry.payee != transfer_type.payee:
         errors.append(
             TransferTransactionError(
                 entry.meta,
-                f"Payee must be {transfer_type['payee']}",
+                WRONG_PAYEE,
                 entry,
+                transfer_type.payee,
             )
         )
 
-    if not entry.narration.startswith(transfer_type["narration_prefix"]):
+    if not entry.narration.startswith(transfer_type.narration_prefix):
         errors.append(
             TransferTransactionError(
                 entry.meta,
-                f"Narration must start with {transfer_type['narration_prefix']}",
+                WRONG_NARRATION,
                 entry,
+                transfer_type.narration_prefix,
             )
         )
 
@@ -98,18 +116,19 @@ def validate_transfer_transaction(entry: data.Transaction, party: str) -> list[T
         errors.append(
             TransferTransactionError(
                 entry.meta,
-                "Transfer transaction must have exactly two postings",
+                EXACTLY_TWO_POSTINGS,
                 entry,
             )
         )
         return errors
 
-    if entry.postings[1].account != transfer_type["account"]:
+    if entry.postings[1].account != transfer_type.account:
         errors.append(
             TransferTransactionError(
                 entry.postings[1].meta,
-                f"Second posting must be to: {transfer_type['account']}",
+                WRONG_SECOND_POSTING_ACCOUNT,
                 entry.postings[1],
+                transfer_type.account,
             )
         )
 
@@ -117,7 +136,7 @@ def validate_transfer_transaction(entry: data.Transaction, party: str) -> list[T
         errors.append(
             TransferTransactionError(
                 entry.postings[0].meta,
-                "First posting amount must be positive for transfer from",
+                NEGATIVE_TRANSFER_FROM,
                 entry.postings[0],
             )
         )
@@ -126,7 +145,7 @@ def validate_transfer_transaction(entry: data.Transaction, party: str) -> list[T
         errors.append(
             TransferTransactionError(
                 entry.postings[0].meta,
-                "First posting amount must be negative for transfer to",
+                POSITIVE_TRANSFER_TO,
                 entry.postings[0],
             )
         )
@@ -0,0 +1,52 @@
+"""Run the shared ratio and transactions validators as one plugin, without a separate walk for the shared ratio."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import incremental, shared_ratio
+from ._transactions.config import CONFIG_PARSERS, parse_config, parse_options
+from .shared_ratio import SharedRatioCheck, retained_income
+from .transactions import validate_transactions
+
+if TYPE_CHECKING:
+    from beancount.core import data
+
+__plugins__ = ("validate_ledger",)
+
+# Options only the shared ratio check takes. Every other option goes to the transactions validator.
+SHARED_RATIO_OPTIONS = frozenset(shared_ratio.CONFIG_PARSERS) - frozenset(CONFIG_PARSERS)
+
+
+def split_config(config: str | None) -> tuple[str, str]:
+    """Split `config` into the options for the shared ratio check and those for the transactions validator."""
+    shared_ratio_options: list[str] = []
+    transactions_options: list[str] = []
+    for option in (config or "").split(";"):
+        key = option.partition("=")[0].strip()
+        (shared_ratio_options if key in SHARED_RATIO_OPTIONS else transactions_options).append(option)
+    return ";".join(shared_ratio_options), ";".join(transactions_options)
+
+
+def validate_ledger(
+    entries: data.Entries, options_map: data.Options, config: str | None = None
+) -> tuple[data.Entries, list[object]]:
+    """
+    Equivalent to loading `shared_ratio` followed by `transactions`, each with its own options from `config`.
+
+    The shared ratio is gathered while the transactions validator registers events, instead of in a pass of its own,
+    unless incremental validation is enabled and the income of unchanged journal files can be reused instead.
+    `parties` and `window_months` only apply to the shared ratio. The `since` and `party` options scope both.
+    """
+    shared_ratio_config, transactions_config = split_config(config)
+    options, config_errors = parse_options(shared_ratio_config, shared_ratio.CONFIG_PARSERS)
+    check = SharedRatioCheck(
+        options.get("parties"), options.get("window_months"), parse_config(transactions_config)[0].scope
+    )
+    validator = incremental.current()
+    if validator is None:
+        entries, errors = validate_transactions(entries, options_map, transactions_config, observe=check.observe)
+    else:
+        check.observe_ledger(entries, retained_income(validator.ledger(options_map)))
+        entries, errors = validate_transactions(entries, options_map, transactions_config)
+    return entries, [*config_errors, *check.errors(), *errors]
@@ -0,0 +1,54 @@
+"""
+Keep validation state between runs over successive versions of a ledger, e.g. when Fava reloads it on every save.
+
+Once `enable` has been called, the transactions, shared ratio and combined plugins running in this process reuse
+what they found for journal files unchanged since their previous run over the same ledger, instead of starting over.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from beancount.core import data
+
+    from ._transactions.cache import ValidationCache
+    from .shared_ratio import IncomeCache
+
+
+class LedgerState:
+    """What the plugins retain about one ledger, filled in by each plugin on its first run."""
+
+    def __init__(self) -> None:
+        self.validation_cache: ValidationCache | None = None
+        self.income: IncomeCache | None = None
+
+
+class IncrementalValidator:
+    """Validation state of every ledger validated in this process, by the path of the ledger's main file."""
+
+    def __init__(self) -> None:
+        self.ledgers: dict[str, LedgerState] = {}
+
+    def ledger(self, options_map: data.Options) -> LedgerState:
+        return self.ledgers.setdefault(options_map.get("filename", ""), LedgerState())
+
+
+# The process-wide validator, when enabled.
+_PROCESS_VALIDATOR: list[IncrementalValidator] = []
+
+
+def enable() -> IncrementalValidator:
+    """Make the plugins keep their state between runs in this process, and return the validator holding it."""
+    if not _PROCESS_VALIDATOR:
+        _PROCESS_VALIDATOR.append(IncrementalValidator())
+    return _PROCESS_VALIDATOR[0]
+
+
+def disable() -> None:
+    """Drop the retained state, so the plugins validate every run from scratch again."""
+    _PROCESS_VALIDATOR.clear()
+
+
+def current() -> IncrementalValidator | None:
+    return _PROCESS_VALIDATOR[0] if _PROCESS_VALIDATOR else None
@@ -1,9 +1,27 @@
 """Validate that the autobean shared-ratio policy matches the actual income split."""
 
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import operator
 from decimal import Decimal
-from typing import NamedTuple
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
 
 from beancount.core import account, data
+from dateutil.relativedelta import relativedelta
+
+from . import incremental
+from ._transactions.cache import journal_fingerprint
+from ._transactions.config import iso_date, parse_options, party_names, positive_int
+from ._transactions.profiling import profile_modes, profiled
+from ._transactions.scope import ValidationScope
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from ._transactions.errors import PluginConfigError
 
 __plugins__ = ("validate_shared_ratio",)
 
@@ -14,85 +32,284 @@ class IncorrectSharedRatio(NamedTuple):
     entry: data.Directive | None
 
 
-PARTY_ACCOUNTS: dict[str, dict[str, str]] = {
-    "Francis": {
-        "from": "Income:Francis:GrossPay",
-        "to": "Assets:Francis:Bank",
-    },
-    "Leyna": {
-        "from": "Income:Leyna:GrossPay",
-        "to": "Assets:Leyna:Bank",
-    },
-}
+# A party's income is paid into `Assets:<Party>:Bank...` from accounts with the components `Income:<Party>:GrossPay`.
+BANK_ACCOUNT = "Assets:{party}:Bank"
+INCOME_ROOT = "Income"
+INCOME_LEAF = "GrossPay"
+
+SHARE_META_PREFIX = "share-"
+
+SHARED_RATIO_NOT_PROVIDED = (
+    "Shared ratio is not provided. Provide the shared ratio using the custom autobean.share.policy directive."
+)
 
 
 def calculate_shared_ratio(total_income: dict[str, Decimal]) -> dict[str, Decimal]:
-    max_income = max(total_income["Francis"], total_income["Leyna"])
+    max_income = max(total_income.values(), default=Decimal(0))
     if max_income == 0:
-        return {"Francis": Decimal(0), "Leyna": Decimal(0)}
-    return {
-        "Francis": total_income["Francis"] / max_income,
-        "Leyna": total_income["Leyna"] / max_income,
-    }
+        return dict.fromkeys(total_income, Decimal(0))
+    return {party: income / max_income for party, income in total_income.items()}
 
 
-def validate_shared_ratio(
-    entries: data.Entries, _unused_options_map: data.Options
-) -> tuple[data.Entries, list[IncorrectSharedRatio]]:
-    errors: list[IncorrectSharedRatio] = []
-    main_party = ""
-    main_account = ""
-    provided_ratio: dict[str, object] = {}
-    total_income: dict[str, Decimal] = {"Francis": Decimal(0), "Leyna": Decimal(0)}
-
-    for entry in entries:
-        is_income_entry = (
-            isinstance(entry, data.Transaction)
-            and main_party in PARTY_ACCOUNTS
-            and main_account.startswith(PARTY_ACCOUNTS[main_party]["to"])
-            and data.has_entry_account_component(entry, PARTY_ACCOUNTS[main_party]["from"])
-        )
+def _journal_income_party(journal_account: str) -> str | None:
+    """Return the party whose income a journal for `journal_account` records, if any."""
+    party = account.split(journal_account)[1]
+    if journal_account.startswith(BANK_ACCOUNT.format(party=party)):
+        return party
+    return None
+
+
+def _income_account_party(income_account: str) -> str | None:
+    """Return the party whose gross pay `income_account` records, if any."""
+    components = account.split(income_account)
+    for index in range(len(components) - 2):
+        if components[index] == INCOME_ROOT and components[index + 2] == INCOME_LEAF:
+            return components[index + 1]
+    return None
+
 
-        if (
-            isinstance(entry, data.Custom)
-            and entry.type == "autobean.share.policy"
-            and entry.values[0].value == "shared"
-        ):
-            provided_ratio = {
-                "Francis": entry.meta["share-Francis"],
-                "Leyna": entry.meta["share-Leyna"],
-            }
+CONFIG_PARSERS = {
+    "parties": party_names,
+    "window_months": positive_int,
+    "since": iso_date,
+    "party": party_names,
+    "profile": profile_modes,
+    "profile_dir": Path,
+}
+
+_posting_account = operator.attrgetter("account")
+
+
+class IncomeRecord(NamedTuple):
+    date: dt.date
+    party: str
+    amount: Decimal
+
+
+def _file_income(file_entries: Sequence[data.Directive], income_accounts: dict[str, set[str]]) -> list[IncomeRecord]:
+    """Return the income recorded in one journal file, in file order."""
+    records: list[IncomeRecord] = []
+    party = None
+    for entry in file_entries:
+        if isinstance(entry, data.Transaction):
+            accounts = income_accounts.get(party)
+            if accounts is not None and not accounts.isdisjoint(map(_posting_account, entry.postings)):
+                records.append(IncomeRecord(entry.date, party, entry.postings[0].units.number))
         elif isinstance(entry, data.Custom) and entry.type == "journal account name":
-            main_account = entry.values[0].value
-            main_party = account.split(main_account)[1]
-        elif is_income_entry:
-            total_income[main_party] += entry.postings[0].units.number
-
-    actual_ratio = calculate_shared_ratio(total_income)
-    if provided_ratio == {}:
-        errors.append(
-            IncorrectSharedRatio(
-                None,
-                "Shared ratio is not provided. "
-                "Provide the shared ratio using the custom autobean.share.policy directive.",
-                None,
-            )
-        )
-    elif provided_ratio != actual_ratio:
-        actual_ratio_str = {
-            "Francis": str(actual_ratio["Francis"]),
-            "Leyna": str(actual_ratio["Leyna"]),
-        }
-        provided_ratio_str = {
-            "Francis": str(provided_ratio["Francis"]),
-            "Leyna": str(provided_ratio["Leyna"]),
-        }
-        errors.append(
-            IncorrectSharedRatio(
-                None,
-                f"Shared ratio is incorrect. Actual: {actual_ratio_str}, Provided: {provided_ratio_str}",
-                None,
+            party = _journal_income_party(entry.values[0].value)
+    return records
+
+
+class IncomeCache:
+    """
+    Each journal file's income, kept between runs over the same ledger.
+
+    A file's income is reused while its source is unchanged and the ledger's income accounts are the same.
+    """
+
+    def __init__(self) -> None:
+        self.income_accounts: dict[str, set[str]] = {}
+        self.files: dict[str, tuple[bytes, list[IncomeRecord]]] = {}
+
+    def income(
+        self, file_entries: dict[str, list[data.Directive]], income_accounts: dict[str, set[str]]
+    ) -> list[IncomeRecord]:
+        """Return the income of every file in `file_entries`, computing it only for files that changed."""
+        if income_accounts != self.income_accounts:
+            self.income_accounts = {party: set(accounts) for party, accounts in income_accounts.items()}
+            self.files.clear()
+        records: list[IncomeRecord] = []
+        files: dict[str, tuple[bytes, list[IncomeRecord]]] = {}
+        for filename, entries in file_entries.items():
+            fingerprint = journal_fingerprint(filename, entries)
+            cached = self.files.get(filename)
+            if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+                file_records = cached[1]
+            else:
+                file_records = _file_income(entries, income_accounts)
+            if fingerprint is not None:
+                files[filename] = (fingerprint, file_records)
+            records.extend(file_records)
+        self.files = files
+        return records
+
+
+class SharedRatioCheck:
+    """
+    Income and the declared share policies, gathered one entry at a time.
+
+    Feeding every entry to `observe` in ledger order and then calling `errors` is equivalent to running
+    `validate_shared_ratio`, which lets another plugin run the check during its own walk over the entries.
+    Each journal file's party comes from the last `journal account name` directive seen in that file, and each
+    party's income accounts are indexed as they are opened, so a transaction costs one set intersection at most.
+
+    Income is kept as per-party running totals by date, so the income of any period is the difference of two
+    totals found by bisection. Each policy is checked against the income of its own period: from its date to the
+    next policy's, with the first policy also covering everything before it. With `window_months`, only the
+    trailing months of each period are used.
+
+    The parties sharing are `parties` when given, otherwise those with a `share-<Party>` key on each policy. With a
+    `scope`, only the policies whose period ends after its `since` date and that are shared by one of its parties are
+    checked. Income is still gathered from the whole ledger, since a policy's ratio depends on every sharing party.
+    """
+
+    def __init__(
+        self,
+        parties: Sequence[str] | None = None,
+        window_months: int | None = None,
+        scope: ValidationScope | None = None,
+    ) -> None:
+        self.parties = parties
+        self.window_months = window_months
+        self.scope = scope
+        self.journal_parties: dict[str, str | None] = {}
+        self.income_accounts: dict[str, set[str]] = {}
+        self.policies: list[data.Custom] = []
+        self.income_dates: dict[str, list[dt.date]] = {}
+        self.cumulative_income: dict[str, list[Decimal]] = {}
+
+    def observe(self, entry: data.Directive) -> None:
+        if isinstance(entry, data.Transaction):
+            party = self.journal_parties.get(entry.meta["filename"])
+            if party is None:
+                return
+            income_accounts = self.income_accounts.get(party)
+            if income_accounts is not None and not income_accounts.isdisjoint(map(_posting_account, entry.postings)):
+                self.income_dates.setdefault(party, []).append(entry.date)
+                totals = self.cumulative_income.setdefault(party, [Decimal(0)])
+                totals.append(totals[-1] + entry.postings[0].units.number)
+        elif isinstance(entry, data.Open):
+            party = _income_account_party(entry.account)
+            if party is not None:
+                self.income_accounts.setdefault(party, set()).add(entry.account)
+        elif isinstance(entry, data.Custom):
+            if entry.type == "autobean.share.policy" and entry.values[0].value == "shared":
+                self.policies.append(entry)
+            elif entry.type == "journal account name":
+                self.journal_parties[entry.meta["filename"]] = _journal_income_party(entry.values[0].value)
+
+    def observe_ledger(self, entries: data.Entries, cache: IncomeCache) -> None:
+        """
+        Gather what observing every entry would, reusing the income of journal files unchanged since the last run.
+
+        Income accounts are taken from the whole ledger rather than from those opened so far, which only differs
+        for income posted to an account before it is opened.
+        """
+        file_entries: dict[str, list[data.Directive]] = {}
+        for entry in entries:
+            file_entries.setdefault(entry.meta["filename"], []).append(entry)
+            if not isinstance(entry, data.Transaction):
+                self.observe(entry)
+
+        for record in sorted(cache.income(file_entries, self.income_accounts), key=operator.itemgetter(0)):
+            self.income_dates.setdefault(record.party, []).append(record.date)
+            totals = self.cumulative_income.setdefault(record.party, [Decimal(0)])
+            totals.append(totals[-1] + record.amount)
+
+    def sharing_parties(self, policy: data.Custom) -> Sequence[str]:
+        if self.parties is not None:
+            return self.parties
+        return sorted(key.removeprefix(SHARE_META_PREFIX) for key in policy.meta if key.startswith(SHARE_META_PREFIX))
+
+    def income(self, party: str, start: dt.date | None, end: dt.date | None) -> Decimal:
+        """Return the income of `party` dated in [start, end), where None leaves that side unbounded."""
+        dates = self.income_dates.get(party)
+        if not dates:
+            return Decimal(0)
+        totals = self.cumulative_income[party]
+        first = 0 if start is None else bisect.bisect_left(dates, start)
+        last = len(dates) if end is None else bisect.bisect_left(dates, end)
+        return totals[max(first, last)] - totals[first]
+
+    def periods(self) -> list[tuple[data.Custom, dt.date | None, dt.date | None]]:
+        """Return each policy with the start and end of the income period it is checked against."""
+        ends = [policy.date for policy in self.policies[1:]]
+        if self.window_months is not None:
+            last_income = max((dates[-1] for dates in self.income_dates.values()), default=None)
+            ends.append(None if last_income is None else last_income + dt.timedelta(days=1))
+        else:
+            ends.append(None)
+
+        periods: list[tuple[data.Custom, dt.date | None, dt.date | None]] = []
+        for index, (policy, end) in enumerate(zip(self.policies, ends, strict=True)):
+            start = None if index == 0 else policy.date
+            if self.window_months is not None and end is not None:
+                window_start = end - relativedelta(months=self.window_months)
+                start = window_start if start is None else max(start, window_start)
+            periods.append((policy, start, end))
+        return periods
+
+    def errors(self) -> list[IncorrectSharedRatio]:
+        if not self.policies:
+            return [
+                IncorrectSharedRatio(
+                    None,
+                    SHARED_RATIO_NOT_PROVIDED,
+                    None,
+                )
+            ]
+        errors: list[IncorrectSharedRatio] = []
+        for policy, start, end in self.periods():
+            if not self.in_scope(policy, end):
+                continue
+            err = self.validate_policy(policy, start, end)
+            if err:
+                errors.append(err)
+        return errors
+
+    def in_scope(self, policy: data.Custom, end: dt.date | None) -> bool:
+        scope = self.scope
+        if scope is None:
+            return True
+        if scope.since is not None and end is not None and end <= scope.since:
+            return False
+        return scope.parties is None or not scope.parties.isdisjoint(self.sharing_parties(policy))
+
+    def validate_policy(
+        self, policy: data.Custom, start: dt.date | None, end: dt.date | None
+    ) -> IncorrectSharedRatio | None:
+        parties = self.sharing_parties(policy)
+        if not parties:
+            return IncorrectSharedRatio(
+                policy.meta,
+                SHARED_RATIO_NOT_PROVIDED,
+                policy,
             )
+
+        provided_ratio = {party: policy.meta.get(f"{SHARE_META_PREFIX}{party}") for party in parties}
+        actual_ratio = calculate_shared_ratio({party: self.income(party, start, end) for party in parties})
+        if provided_ratio == actual_ratio:
+            return None
+        actual_ratio_str = {party: str(ratio) for party, ratio in actual_ratio.items()}
+        provided_ratio_str = {party: str(ratio) for party, ratio in provided_ratio.items()}
+        return IncorrectSharedRatio(
+            policy.meta,
+            f"Shared ratio is incorrect. Actual: {actual_ratio_str}, Provided: {provided_ratio_str}",
+            policy,
         )
 
-    return entries, errors
+
+def retained_income(ledger: incremental.LedgerState) -> IncomeCache:
+    if ledger.income is None:
+        ledger.income = IncomeCache()
+    return ledger.income
+
+
+def validate_shared_ratio(
+    entries: data.Entries, options_map: data.Options, config: str | None = None
+) -> tuple[data.Entries, list[IncorrectSharedRatio | PluginConfigError]]:
+    options, config_errors = parse_options(config, CONFIG_PARSERS)
+    with profiled("shared_ratio", options.get("profile", frozenset()), options.get("profile_dir", Path())):
+        scope = None
+        if "since" in options or "party" in options:
+            parties = frozenset(options["party"]) if "party" in options else None
+            scope = ValidationScope(options.get("since"), parties)
+        check = SharedRatioCheck(options.get("parties"), options.get("window_months"), scope)
+        validator = incremental.current()
+        if validator is None:
+            for entry in entries:
+                check.observe(entry)
+        else:
+            check.observe_ledger(entries, retained_income(validator.ledger(options_map)))
+        errors = check.errors()
+    return entries, [*config_errors, *errors]
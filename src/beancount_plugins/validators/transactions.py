@@ -1,30 +1,121 @@
+from __future__ import annotations
+
+import functools
+import heapq
+import multiprocessing
+import operator
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
 from beancount.core import data
 
+from . import incremental
+from ._transactions.aggregation import cap_errors
 from ._transactions.balance_assertions import validate_balance_assertion
+from ._transactions.cache import ValidationCache, cache_settings, journal_fingerprint
+from ._transactions.changed_files import changed_journal_files
+from ._transactions.config import RULE_FAMILIES, parse_config
+from ._transactions.dispatch import EntryChecks, RuleContext, TransactionRule, build_rule_set
+from ._transactions.document_resolver import DocumentResolver, UncheckedResolver, prefetch_directories
 from ._transactions.errors import (
+    EventTransactionError,
     FirstPostingIsNotToSpecifiedAccountError,
     JournalError,
     MissingOpeningBalanceError,
+    message_template,
 )
 from ._transactions.events import (
+    EVENT_NOT_FOUND,
+    EVENT_TRIGGERS,
+    EventRegistry,
     get_event_id,
     is_event_transaction,
     is_linked_event,
+    linked_event_id,
     validate_event,
     validate_event_transaction,
 )
-from ._transactions.link_documents import create_document_entries
-from ._transactions.opening_balance import is_opening_balance_transaction, validate_opening_balance_transaction
-from ._transactions.owed import is_owed_transaction, validate_owed_transaction
-from ._transactions.payslip import is_payslip_transaction, validate_payslip_transaction
-from ._transactions.receipt import is_receipt_transaction, validate_receipt_transaction
-from ._transactions.transfer import is_transfer_transaction, validate_transfer_transaction
+from ._transactions.features import extract_features
+from ._transactions.instrumentation import Instrumentation, instrumentation_destination
+from ._transactions.journal import JournalFile, JournalResult, initialise_journal_file, merge_journal_results
+from ._transactions.link_documents import create_document_entries, document_filenames, merge_documents
+from ._transactions.opening_balance import (
+    OPENING_BALANCE_TRIGGERS,
+    is_opening_balance_transaction,
+    validate_opening_balance_transaction,
+)
+from ._transactions.owed import OWED_TRIGGERS, is_owed_transaction, validate_owed_transaction
+from ._transactions.payslip import PAYSLIP_TRIGGERS, is_payslip_transaction, validate_payslip_transaction
+from ._transactions.profiling import profiled
+from ._transactions.receipt import RECEIPT_TRIGGERS, is_receipt_transaction, validate_receipt_transaction
+from ._transactions.transfer import TRANSFER_TRIGGERS, is_transfer_transaction, validate_transfer_transaction
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    from ._transactions.config import TransactionsConfig
+    from ._transactions.scope import ValidationScope
 
 __plugins__ = ("validate_transactions",)
 
+# Evaluated in this order, so errors for a transaction are always reported in the same sequence.
+TRANSACTION_RULES: tuple[TransactionRule, ...] = (
+    TransactionRule(
+        "opening_balance",
+        OPENING_BALANCE_TRIGGERS,
+        lambda entry, _context: is_opening_balance_transaction(entry),
+        lambda entry, _context: validate_opening_balance_transaction(entry),
+    ),
+    TransactionRule(
+        "transfer",
+        TRANSFER_TRIGGERS,
+        lambda entry, context: is_transfer_transaction(entry, context.features),
+        lambda entry, context: validate_transfer_transaction(entry, context.journal.transfer_types),
+    ),
+    TransactionRule(
+        "owed",
+        OWED_TRIGGERS,
+        lambda entry, context: is_owed_transaction(entry, context.journal.party, context.features),
+        lambda entry, context: validate_owed_transaction(entry, context.journal.party, context.features),
+    ),
+    TransactionRule(
+        "receipt",
+        RECEIPT_TRIGGERS,
+        lambda entry, context: is_receipt_transaction(entry, context.features),
+        lambda entry, context: validate_receipt_transaction(entry, context.features),
+        needs_documents=True,
+    ),
+    TransactionRule(
+        "payslip",
+        PAYSLIP_TRIGGERS,
+        lambda entry, _context: is_payslip_transaction(entry),
+        lambda entry, context: validate_payslip_transaction(entry, context.journal.party),
+        needs_documents=True,
+    ),
+    TransactionRule(
+        "event",
+        EVENT_TRIGGERS,
+        lambda entry, _context: is_event_transaction(entry),
+        lambda entry, context: validate_event_transaction(entry, context.events),
+    ),
+)
+TRANSACTION_RULE_SET = build_rule_set(TRANSACTION_RULES)
+TRANSACTION_RULE_INDEX = TRANSACTION_RULE_SET.index
+
+MISSING_JOURNAL_FILE = message_template(
+    "Journal party and account must be specified before all following transactions using custom directive"
+)
+WRONG_FIRST_POSTING_ACCOUNT = message_template("The first posting should be to the account: {}")
+MISSING_OPENING_BALANCE = message_template("Journal opening balance transaction must be specified before transactions")
+
+# The (file groups, events, checks, scope) being validated in parallel, inherited by forked worker processes.
+_FORKED_LEDGER: list = []
+
 
 def get_transaction_filename(
-    entry: data.Transaction, file_account_map: dict[str, dict[str, str]]
+    entry: data.Transaction, file_account_map: dict[str, JournalFile]
 ) -> tuple[str, JournalError | None]:
     err = None
 
@@ -32,7 +123,7 @@ def get_transaction_filename(
     if transaction_filename not in file_account_map:
         err = JournalError(
             entry.meta,
-            "Journal party and account must be specified before all following transactions using custom directive",
+            MISSING_JOURNAL_FILE,
             entry,
         )
 
@@ -46,8 +137,9 @@ def validate_first_posting_account(
     if entry.postings[0].account != account:
         err = FirstPostingIsNotToSpecifiedAccountError(
             entry.meta,
-            f"The first posting should be to the account: {account}",
+            WRONG_FIRST_POSTING_ACCOUNT,
             entry,
+            account,
         )
     return err
 
@@ -59,37 +151,44 @@ def should_skip(entry: data.Directive) -> bool:
 
 
 def _validate_transaction(
-    entry: data.Transaction, party: str, account: str, event_ids: list[str]
+    entry: data.Transaction, journal: JournalFile, events: EventRegistry, checks: EntryChecks
 ) -> tuple[list[object], bool]:
-    """Run all per-transaction validators. Return (errors, needs_document_entries)."""
+    """Run the validators whose triggers match `entry`. Return (errors, needs_document_entries)."""
     errors: list[object] = []
     needs_documents = False
 
-    err = validate_first_posting_account(entry, account)
+    err = checks.first_posting_account(entry, journal.account)
     if err:
         errors.append(err)
 
-    if is_opening_balance_transaction(entry):
-        errors.extend(validate_opening_balance_transaction(entry))
-
-    if is_transfer_transaction(entry):
-        errors.extend(validate_transfer_transaction(entry, party))
-
-    if is_owed_transaction(entry, party):
-        errors.extend(validate_owed_transaction(entry, party))
+    features = extract_features(entry)
+    rule_set = checks.rule_set
+    candidates = rule_set.index.match(entry, features, journal.party)
+    if not candidates:
+        return errors, needs_documents
 
-    if is_receipt_transaction(entry):
-        errors.extend(validate_receipt_transaction(entry))
-        needs_documents = True
+    context = RuleContext(journal, events, features)
+    for position, rule in enumerate(rule_set.rules):
+        if candidates >> position & 1 and rule.applies(entry, context):
+            errors.extend(rule.validate(entry, context))
+            needs_documents = needs_documents or rule.needs_documents
 
-    if is_payslip_transaction(entry):
-        errors.extend(validate_payslip_transaction(entry, party))
-        needs_documents = True
+    return errors, needs_documents
 
-    if is_event_transaction(entry):
-        errors.extend(validate_event_transaction(entry, event_ids))
 
-    return errors, needs_documents
+def _needs_documents(entry: data.Transaction, journal: JournalFile, events: EventRegistry, checks: EntryChecks) -> bool:
+    """Return whether `_validate_transaction` would ask for the documents of `entry`, without validating it."""
+    if "payslip" not in entry.meta and not any("receipt" in posting.meta for posting in entry.postings):
+        # Nothing for create_document_entries to link.
+        return False
+    features = extract_features(entry)
+    rule_set = checks.rule_set
+    candidates = rule_set.index.match(entry, features, journal.party)
+    context = RuleContext(journal, events, features)
+    return any(
+        rule.needs_documents and candidates >> position & 1 and rule.applies(entry, context)
+        for position, rule in enumerate(rule_set.rules)
+    )
 
 
 def _is_missing_opening_balance(
@@ -108,22 +207,83 @@ def _record_first_transaction_for_file(transaction_filename: str, files_seen: se
     files_seen.add(transaction_filename)
 
 
-def _process_event(entry: data.Event, event_ids: list[str]) -> list[object]:
+def _process_event(entry: data.Event, events: EventRegistry) -> list[object]:
     errors: list[object] = list(validate_event(entry))
     if is_linked_event(entry):
-        event_id, err = get_event_id(entry, event_ids)
+        event_id, err = get_event_id(entry, events)
         if err:
             errors.append(err)
         elif event_id is not None:
-            event_ids.append(event_id)
+            events[event_id] = entry
     return errors
 
 
+def _register_events(
+    entries: data.Entries,
+    checks: EntryChecks,
+    observe: Callable[[data.Directive], None] | None = None,
+    scope: ValidationScope | None = None,
+) -> tuple[EventRegistry, list[object]]:
+    """
+    Validate every Event up front, so a transaction may refer to a linked event dated after it.
+
+    Events out of `scope` are still registered, but their errors are not reported. This is the one pass that visits
+    every entry, so `observe`, when given, is called with each of them in order.
+    """
+    events: EventRegistry = {}
+    errors: list[object] = []
+    process_event = checks.event
+    if process_event is not None and scope is not None:
+        check_event = process_event
+
+        def process_event(entry: data.Event, events: EventRegistry) -> list[object]:
+            event_errors = check_event(entry, events)
+            return event_errors if scope.includes_event(entry) else []
+
+    if observe is None:
+        if process_event is None:
+            return events, errors
+        for entry in entries:
+            if isinstance(entry, data.Event) and not should_skip(entry):
+                errors.extend(process_event(entry, events))
+        return events, errors
+
+    for entry in entries:
+        observe(entry)
+        if process_event is not None and isinstance(entry, data.Event) and not should_skip(entry):
+            errors.extend(process_event(entry, events))
+    return events, errors
+
+
+DEFAULT_CHECKS = EntryChecks(
+    TRANSACTION_RULE_SET,
+    validate_first_posting_account,
+    validate_balance_assertion,
+    _process_event,
+    create_document_entries,
+)
+
+
+@functools.cache
+def _entry_checks(rules: frozenset[str], *, documents: bool) -> EntryChecks:
+    """Return the checks of the enabled rule families. Disabled rules are left out, so they never run."""
+    if rules == RULE_FAMILIES and documents:
+        return DEFAULT_CHECKS
+    return EntryChecks(
+        build_rule_set([rule for rule in TRANSACTION_RULES if rule.name in rules]),
+        validate_first_posting_account,
+        validate_balance_assertion,
+        _process_event if "event" in rules else None,
+        create_document_entries if documents else None,
+    )
+
+
 def _process_transaction(
     entry: data.Transaction,
-    file_account_map: dict[str, dict[str, str]],
+    file_account_map: dict[str, JournalFile],
     files_seen: set[str],
-    event_ids: list[str],
+    events: EventRegistry,
+    checks: EntryChecks,
 ) -> tuple[list[object], bool]:
     """Validate a Transaction. Returns (errors, needs_document_entries)."""
     transaction_filename, journal_err = get_transaction_filename(entry, file_account_map)
@@ -135,57 +295,466 @@ def _process_transaction(
         errors.append(
             MissingOpeningBalanceError(
                 entry.meta,
-                "Journal opening balance transaction must be specified before transactions",
+                MISSING_OPENING_BALANCE,
                 entry,
             )
         )
     _record_first_transaction_for_file(transaction_filename, files_seen)
 
-    party = file_account_map[transaction_filename]["party"]
-    account = file_account_map[transaction_filename]["account"]
-    txn_errors, needs_documents = _validate_transaction(entry, party, account, event_ids)
+    journal = file_account_map[transaction_filename]
+    txn_errors, needs_documents = _validate_transaction(entry, journal, events, checks)
     errors.extend(txn_errors)
     return errors, needs_documents
 
 
-def validate_transactions(
-    entries: data.Entries, _unused_options_map: data.Options
-) -> tuple[data.Entries, list[object]]:
-    errors: list[object] = []
-    entries_with_documents: list[data.Balance | data.Transaction] = []
-    event_ids: list[str] = []
-    file_account_map: dict[str, dict[str, str]] = {}
-    files_with_first_transaction_seen: set[str] = set()
-
-    for entry in entries:
+class TransactionValidator:
+    """
+    Validate a ledger fed one entry at a time, in ledger order, reporting each entry's errors as soon as it is fed.
+
+    Only the state a journal file or a linked event needs is kept. When `events` is given they are taken as every
+    linked event of the ledger, registered up front. Otherwise events are registered as they are fed, and a
+    transaction linked to an event not seen yet is only reported by `finish`, if the event never turns up. Documents
+    are checked and returned by `feed` when a `resolver` is given.
+
+    With a `scope`, entries out of it are not validated. They only register their journal file, whether it starts
+    with an opening balance, and their linked event, and have their documents linked without checking that they
+    exist.
+    """
+
+    def __init__(
+        self,
+        checks: EntryChecks = DEFAULT_CHECKS,
+        events: EventRegistry | None = None,
+        resolver: DocumentResolver | None = None,
+        scope: ValidationScope | None = None,
+    ) -> None:
+        self.checks = checks
+        self.scope = scope
+        self.registers_events = events is None and checks.event is not None
+        self.events: EventRegistry = {} if events is None else events
+        self.resolver = resolver if checks.documents else None
+        self.unchecked_resolver = UncheckedResolver()
+        self.file_account_map: dict[str, JournalFile] = {}
+        self.files_seen: set[str] = set()
+        # Errors of transactions linked to events not seen yet, by event id, with the position they were fed at.
+        self.pending_events: dict[str, list[tuple[int, object]]] = {}
+        self.position = 0
+
+    def check(self, entry: data.Directive) -> tuple[list[object], bool]:
+        """Validate `entry` without checking its documents. Return (errors, needs_document_entries)."""
+        self.position += 1
         if should_skip(entry):
-            continue
+            return [], False
 
         if isinstance(entry, data.Balance):
-            errors.extend(validate_balance_assertion(entry))
-            entries_with_documents.append(entry)
-
-        elif isinstance(entry, data.Custom) and entry.type == "initialise_journal_file":
-            filename = entry.meta["filename"]
-            file_account_map[filename] = {
-                "party": entry.values[0].value,
-                "account": entry.values[1].value,
-            }
+            errors = list(self.checks.balance_assertion(entry))
+            return errors if self.in_scope(entry) else [], True
 
-        elif isinstance(entry, data.Event):
-            errors.extend(_process_event(entry, event_ids))
+        if isinstance(entry, data.Custom) and entry.type == "initialise_journal_file":
+            self.file_account_map[entry.meta["filename"]] = initialise_journal_file(entry)
 
         elif isinstance(entry, data.Transaction):
-            txn_errors, needs_documents = _process_transaction(
-                entry, file_account_map, files_with_first_transaction_seen, event_ids
-            )
-            errors.extend(txn_errors)
-            if needs_documents:
-                entries_with_documents.append(entry)
-
-    for entry in entries_with_documents:
-        document_entries, document_errors = create_document_entries(entry)
+            return self._check_transaction(entry)
+
+        elif isinstance(entry, data.Event) and self.registers_events:
+            return self._register_event(entry), False
+
+        return [], False
+
+    def in_scope(self, entry: data.Directive) -> bool:
+        scope = self.scope
+        return scope is None or scope.includes(entry, self.file_account_map.get(entry.meta["filename"]), self.events)
+
+    def _check_transaction(self, entry: data.Transaction) -> tuple[list[object], bool]:
+        if not self.in_scope(entry):
+            # Only whether the journal's first transaction has been seen matters for the transactions after it.
+            journal = self.file_account_map.get(entry.meta["filename"])
+            if journal is None:
+                return [], False
+            _record_first_transaction_for_file(entry.meta["filename"], self.files_seen)
+            return [], _needs_documents(entry, journal, self.events, self.checks)
+        errors, needs_documents = _process_transaction(
+            entry, self.file_account_map, self.files_seen, self.events, self.checks
+        )
+        if errors and self.registers_events:
+            errors = self._defer_missing_events(errors)
+        return errors, needs_documents
+
+    def _register_event(self, entry: data.Event) -> list[object]:
+        errors = list(self.checks.event(entry, self.events))
+        if self.scope is not None and not self.scope.includes_event(entry):
+            errors = []
+        event_id = entry.meta.get("id")
+        if event_id in self.pending_events and self.events.get(event_id) is entry:
+            del self.pending_events[event_id]
+        return errors
+
+    def _defer_missing_events(self, errors: list[object]) -> list[object]:
+        reported: list[object] = []
+        for err in errors:
+            if isinstance(err, EventTransactionError) and err.template_id == EVENT_NOT_FOUND:
+                self.pending_events.setdefault(linked_event_id(err.entry), []).append((self.position, err))
+            else:
+                reported.append(err)
+        return reported
+
+    def feed(self, entry: data.Directive) -> tuple[list[data.Document], list[object]]:
+        """Validate `entry` and check its documents. Return (document_entries, errors)."""
+        errors, needs_documents = self.check(entry)
+        if not needs_documents or self.resolver is None:
+            return [], errors
+        resolver = self.resolver if self.in_scope(entry) else self.unchecked_resolver
+        document_entries, document_errors = self.checks.documents(entry, resolver)
+        return document_entries, [*errors, *document_errors]
+
+    def finish(self) -> list[object]:
+        """Report the transactions linked to events that never turned up, and persist the document listings."""
+        pending = sorted(
+            (position_error for waiting in self.pending_events.values() for position_error in waiting),
+            key=operator.itemgetter(0),
+        )
+        self.pending_events.clear()
+        if self.resolver is not None:
+            self.resolver.save()
+        return [err for _, err in pending]
+
+
+def validate_stream(entries: Iterable[data.Directive], config: str | None = None) -> Iterator[object]:
+    """
+    Validate `entries` lazily, yielding each error as soon as it is known, for use outside a beancount plugin.
+
+    Takes the plugin config string, of which `rules`, `documents`, `document_cache`, `since` and `party` apply.
+    Config errors are yielded first, and errors deferred until the end of the stream last.
+    """
+    plugin_config, config_errors = parse_config(config)
+    yield from config_errors
+    checks = _entry_checks(plugin_config.rules, documents=plugin_config.documents)
+    validator = TransactionValidator(
+        checks, resolver=DocumentResolver(plugin_config.document_cache), scope=plugin_config.scope
+    )
+    for entry in entries:
+        yield from validator.feed(entry)[1]
+    yield from validator.finish()
+
+
+def _validate_entries(
+    entries: Sequence[data.Directive],
+    events: EventRegistry,
+    checks: EntryChecks = DEFAULT_CHECKS,
+    max_errors: int | None = None,
+    scope: ValidationScope | None = None,
+) -> JournalResult:
+    """
+    Validate the entries of `entries` in `scope` against the registered events, recording positions within `entries`.
+
+    With `max_errors`, stop after the entry that brings the number of errors up to it.
+    """
+    result = JournalResult([], [], [], [])
+    if max_errors is not None and max_errors <= 0:
+        return result
+    validator = TransactionValidator(checks, events, scope=scope)
+
+    for position, entry in enumerate(entries):
+        had_statement = "statement" in entry.meta
+        errors, needs_documents = validator.check(entry)
+        if errors:
+            result.errors.extend((position, _posting_index(entry, err), err) for err in errors)
+            if max_errors is not None and len(result.errors) >= max_errors:
+                break
+        if needs_documents:
+            if validator.in_scope(entry):
+                result.document_positions.append(position)
+            else:
+                result.unchecked_documents.append(position)
+            if had_statement and "statement" not in entry.meta:
+                result.dropped_statements.append(position)
+
+    return result
+
+
+def _posting_index(entry: data.Directive, err: object) -> int | None:
+    """Return the index of the posting of `entry` that `err` was raised on, or None if it was raised on the entry."""
+    target = getattr(err, "entry", None)
+    if not isinstance(target, data.Posting):
+        return None
+    return next(index for index, posting in enumerate(entry.postings) if posting is target)
+
+
+def _group_by_file(entries: data.Entries) -> dict[str, list[int]]:
+    """Return the positions of the entries of each file. Journal state never crosses files."""
+    groups: dict[str, list[int]] = {}
+    for position, entry in enumerate(entries):
+        groups.setdefault(entry.meta["filename"], []).append(position)
+    return groups
+
+
+def _replay_validation(file_entries: Sequence[data.Directive], result: JournalResult) -> JournalResult:
+    """
+    Apply a result computed on other copies of `file_entries` (cached, or from a worker process) to these entries.
+
+    Validation drops future statements from the entries themselves, and errors must refer to the ledger's own
+    entries, or postings, rather than to the copies they were raised on.
+    """
+    for position in result.dropped_statements:
+        file_entries[position].meta.pop("statement", None)
+    errors = []
+    for position, posting, err in result.errors:
+        if getattr(err, "entry", None) is None:
+            errors.append((position, posting, err))
+            continue
+        target = file_entries[position] if posting is None else file_entries[position].postings[posting]
+        errors.append((position, posting, err._replace(source=target.meta, entry=target)))
+    return result._replace(errors=errors)
+
+
+def _validate_forked_group(index: int) -> JournalResult:
+    file_groups, events, checks, scope = _FORKED_LEDGER
+    return _validate_entries(file_groups[index], events, checks, scope=scope)
+
+
+def _can_fork() -> bool:
+    """
+    Return whether worker processes can safely be forked from this process.
+
+    Forking a process that runs other threads, e.g. a Fava server that loads the plugin, can deadlock the child on a
+    lock one of those threads held.
+    """
+    return "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def _free_threaded() -> bool:
+    """Return whether the interpreter runs without the GIL, so threads can validate files in parallel."""
+    return not sys._is_gil_enabled()  # noqa: SLF001
+
+
+def _validate_file_groups_in_threads(
+    file_groups: Sequence[Sequence[data.Directive]],
+    events: EventRegistry,
+    checks: EntryChecks,
+    order: Sequence[int],
+    plugin_config: TransactionsConfig,
+) -> list[JournalResult]:
+    """
+    Validate each journal file's entries in a pool of `workers` threads.
+
+    Each file gets its own validator, so the only state threads share is the event registry, which is complete and
+    only read once validation starts, and the rules' caches, which are safe to fill concurrently.
+    """
+    workers = min(plugin_config.workers, len(file_groups))
+    scope = plugin_config.scope
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validate") as executor:
+        futures = {
+            index: executor.submit(_validate_entries, file_groups[index], events, checks, scope=scope)
+            for index in order
+        }
+        return [futures[index].result() for index in range(len(file_groups))]
+
+
+def _validate_file_groups(
+    file_groups: Sequence[Sequence[data.Directive]],
+    events: EventRegistry,
+    checks: EntryChecks,
+    plugin_config: TransactionsConfig,
+) -> list[JournalResult]:
+    """
+    Validate each journal file's entries, in a pool of `workers` processes or threads when there is more than one.
+
+    Threads validate the ledger's own entries. Pickling the entries to worker processes costs several times more
+    than validating them, so worker processes are forked, inherit the ledger and are only sent the index of the file
+    to validate. Where the process cannot safely be forked, the files are validated serially instead.
+    """
+    workers = plugin_config.workers
+    scope = plugin_config.scope
+    if workers == 1 or len(file_groups) <= 1:
+        return [_validate_entries(file_entries, events, checks, scope=scope) for file_entries in file_groups]
+
+    # Submit the largest files first so one long journal does not hold up the end of the run.
+    order = sorted(range(len(file_groups)), key=lambda index: len(file_groups[index]), reverse=True)
+    if plugin_config.backend == "thread":
+        return _validate_file_groups_in_threads(file_groups, events, checks, order, plugin_config)
+    if not _can_fork():
+        return [_validate_entries(file_entries, events, checks, scope=scope) for file_entries in file_groups]
+    context = multiprocessing.get_context("fork")
+    results: list[JournalResult | None] = [None] * len(file_groups)
+    _FORKED_LEDGER[:] = (file_groups, events, checks, scope)
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_groups)), mp_context=context) as executor:
+            futures = {index: executor.submit(_validate_forked_group, index) for index in order}
+            for index, future in futures.items():
+                results[index] = _replay_validation(file_groups[index], future.result())
+    finally:
+        _FORKED_LEDGER.clear()
+    return results
+
+
+def _validation_cache(plugin_config: TransactionsConfig, options_map: data.Options) -> ValidationCache | None:
+    """
+    Return the cache of per-file results to use for this run, if any.
+
+    With incremental validation enabled, the ledger's cache is kept in memory between runs, and only replaced when
+    the settings it was built under change.
+    """
+    validator = incremental.current()
+    if validator is None:
+        if plugin_config.validation_cache is None:
+            return None
+        return ValidationCache(plugin_config.validation_cache, plugin_config.rules, plugin_config.scope)
+
+    ledger = validator.ledger(options_map)
+    cache = ledger.validation_cache
+    if (
+        cache is None
+        or cache.path != plugin_config.validation_cache
+        or cache.settings != cache_settings(plugin_config.rules, plugin_config.scope)
+    ):
+        cache = ledger.validation_cache = ValidationCache(
+            plugin_config.validation_cache, plugin_config.rules, plugin_config.scope
+        )
+    return cache
+
+
+def _validate_by_file(
+    entries: data.Entries,
+    events: EventRegistry,
+    checks: EntryChecks,
+    cache: ValidationCache | None,
+    plugin_config: TransactionsConfig,
+) -> JournalResult:
+    """
+    Validate the ledger one journal file at a time.
+
+    Files are served from the validation cache when unchanged, and the rest are validated in a pool of processes, or
+    threads with the thread backend, when more than one worker is configured. Results are merged back in ledger order
+    either way.
+    """
+    groups = _group_by_file(entries)
+    results: dict[str, JournalResult] = {}
+    pending: dict[str, bytes | None] = {}
+
+    for filename, positions in groups.items():
+        file_entries = [entries[position] for position in positions]
+        fingerprint = journal_fingerprint(filename, file_entries) if cache else None
+        cached = cache.lookup(filename, fingerprint, file_entries, events) if cache and fingerprint else None
+        if cached is None:
+            pending[filename] = fingerprint
+        else:
+            results[filename] = _replay_validation(file_entries, cached)
+
+    file_groups = [[entries[position] for position in groups[filename]] for filename in pending]
+    validated = _validate_file_groups(file_groups, events, checks, plugin_config)
+    for (filename, fingerprint), file_entries, result in zip(pending.items(), file_groups, validated, strict=True):
+        results[filename] = result
+        if cache and fingerprint:
+            cache.store(filename, fingerprint, file_entries, result, events)
+
+    if cache:
+        cache.save()
+    return merge_journal_results((groups[filename], results[filename]) for filename in groups)
+
+
+def _link_documents(
+    entries: data.Entries,
+    result: JournalResult,
+    errors: list[object],
+    checks: EntryChecks,
+    plugin_config: TransactionsConfig,
+) -> list[data.Document]:
+    """
+    Check that the documents of the entries at `result.document_positions` exist, and return Document entries for them.
+
+    The documents of `result.unchecked_documents` are linked too, in ledger order, but not checked. In fail-fast
+    mode, stop once `errors` holds as many errors as the mode allows.
+    """
+    max_errors = plugin_config.fail_fast
+    resolver = DocumentResolver(plugin_config.document_cache)
+    if plugin_config.document_concurrency > 1 or plugin_config.document_timeout is not None:
+        prefetch_directories(
+            resolver,
+            (filename for position in result.document_positions for filename in document_filenames(entries[position])),
+            plugin_config.document_concurrency,
+            plugin_config.document_timeout,
+        )
+    unchecked = set(result.unchecked_documents)
+    unchecked_resolver = UncheckedResolver()
+    documents: list[data.Document] = []
+    for position in heapq.merge(result.document_positions, result.unchecked_documents):
+        entry_resolver = unchecked_resolver if position in unchecked else resolver
+        document_entries, document_errors = checks.documents(entries[position], entry_resolver)
         errors.extend(document_errors)
-        entries.extend(document_entries)
-
+        documents.extend(document_entries)
+        if max_errors is not None and len(errors) >= max_errors:
+            break
+    resolver.save()
+    return documents
+
+
+def _validate_transactions(
+    entries: data.Entries,
+    options_map: data.Options,
+    plugin_config: TransactionsConfig,
+    observe: Callable[[data.Directive], None] | None,
+) -> tuple[data.Entries, list[object]]:
+    checks = _entry_checks(plugin_config.rules, documents=plugin_config.documents)
+    instrumentation_output = instrumentation_destination(plugin_config.instrumentation)
+    instrumentation = Instrumentation() if instrumentation_output else None
+    if instrumentation:
+        checks = instrumentation.instrument(checks)
+        # Worker processes would keep their counters to themselves, and threads would race on them. Files served from
+        # the validation cache, on disk or retained by incremental validation, would never reach the checks.
+        plugin_config = plugin_config._replace(workers=1, validation_cache=None)
+    elif plugin_config.backend == "thread" and not _free_threaded():
+        # With the GIL, threads would only take turns at the same work.
+        plugin_config = plugin_config._replace(workers=1)
+
+    changed_files_errors: list[object] = []
+    if plugin_config.changed_files is not None:
+        files, changed_files_errors = changed_journal_files(
+            plugin_config.changed_files, (entry.meta["filename"] for entry in entries), options_map.get("filename", "")
+        )
+        # The cache could only serve unchanged files, which are not validated anyway.
+        plugin_config = plugin_config._replace(files=files, validation_cache=None)
+
+    scope = plugin_config.scope
+    events, errors = _register_events(entries, checks, observe, scope)
+    errors[:0] = changed_files_errors
+
+    max_errors = plugin_config.fail_fast
+    cache = _validation_cache(plugin_config, options_map) if max_errors is None and not instrumentation else None
+    if max_errors is not None:
+        # Stopping at the first errors of the ledger needs a single walk in ledger order, without cache or workers.
+        result = _validate_entries(entries, events, checks, max_errors - len(errors), scope)
+    elif cache is None and plugin_config.workers == 1:
+        result = _validate_entries(entries, events, checks, scope=scope)
+    else:
+        result = _validate_by_file(entries, events, checks, cache, plugin_config)
+    errors.extend(err for *_, err in result.errors)
+    if checks.documents is not None and (max_errors is None or len(errors) < max_errors):
+        documents = _link_documents(entries, result, errors, checks, plugin_config)
+        entries = merge_documents(entries, documents)
+    if max_errors is not None:
+        del errors[max_errors:]
+
+    if instrumentation:
+        instrumentation.write(instrumentation_output)
     return entries, errors
+
+
+def validate_transactions(
+    entries: data.Entries,
+    options_map: data.Options,
+    config: str | None = None,
+    *,
+    observe: Callable[[data.Directive], None] | None = None,
+) -> tuple[data.Entries, list[object]]:
+    """
+    Validate the transactions, balances and events of the ledger, and link their documents.
+
+    `observe` is called with every entry, in order, during the traversal that registers events, so other checks
+    can share it instead of walking the entries again.
+    """
+    plugin_config, config_errors = parse_config(config)
+    with profiled("transactions", plugin_config.profile, plugin_config.profile_dir):
+        entries, errors = _validate_transactions(entries, options_map, plugin_config, observe)
+        if plugin_config.error_cap is not None:
+            errors = cap_errors(errors, plugin_config.error_cap)
+    return entries, [*config_errors, *errors]
@@ -0,0 +1,94 @@
+from beancount_plugins.validators.combined import validate_ledger
+from beancount_plugins.validators.shared_ratio import validate_shared_ratio
+from beancount_plugins.validators.transactions import validate_transactions
+
+LEDGER_SOURCE = """
+    2000-01-01 custom "autobean.share.policy" "shared"
+      share-Francis: 1
+      share-Leyna: 1
+
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 custom "journal account name" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 open Income:Francis:GrossPay:Salary
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+
+    2000-01-25 * "Employer" "Salary" #payslip
+      Assets:Francis:Bank        100 GBP
+      Income:Francis:GrossPay:Salary   -100 GBP
+
+    2000-02-01 balance Assets:Francis:Bank 101 GBP
+"""
+
+
+def test_combined_plugin_matches_separate_plugins(load_doc):
+    entries, options_map = load_doc(LEDGER_SOURCE)
+    _, shared_ratio_errors = validate_shared_ratio(list(entries), options_map)
+    separate_entries, transaction_errors = validate_transactions(list(entries), options_map)
+
+    combined_entries, combined_errors = validate_ledger(list(entries), options_map)
+
+    assert combined_entries == separate_entries
+    assert [e.message for e in combined_errors] == [e.message for e in shared_ratio_errors + transaction_errors]
+    assert len(shared_ratio_errors) == 1
+    assert len(transaction_errors) == 2
+
+
+def test_combined_plugin_passes_shared_ratio_options_on(load_doc):
+    """`parties` and `window_months` reach the shared ratio check, and the rest of the config the transactions."""
+    entries, options_map = load_doc(LEDGER_SOURCE)
+    _, shared_ratio_errors = validate_shared_ratio(
+        list(entries), options_map, "parties=Francis,Leyna,Sam;window_months=12"
+    )
+    _, transaction_errors = validate_transactions(list(entries), options_map, "documents=off")
+
+    _, combined_errors = validate_ledger(
+        list(entries), options_map, "parties=Francis,Leyna,Sam;window_months=12;documents=off"
+    )
+
+    assert [e.message for e in combined_errors] == [e.message for e in shared_ratio_errors + transaction_errors]
+    expected = (
+        "Actual: {'Francis': '1', 'Leyna': '0', 'Sam': '0'}, Provided: {'Francis': '1', 'Leyna': '1', 'Sam': 'None'}"
+    )
+    assert [e.message for e in shared_ratio_errors] == [f"Shared ratio is incorrect. {expected}"]
+
+
+WINDOW_LEDGER_SOURCE = """
+    2000-01-01 custom "autobean.share.policy" "shared"
+      share-Francis: 1
+      share-Leyna: 1
+
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Income:Francis:GrossPay:Salary
+    2000-01-01 open Assets:Leyna:Bank
+    2000-01-01 open Income:Leyna:GrossPay:Salary
+
+    2000-01-02 custom "journal account name" "Assets:Leyna:Bank"
+    2000-01-02 * "Leyna Payslip"
+      Assets:Leyna:Bank        100 GBP
+      Income:Leyna:GrossPay:Salary    -100 GBP
+
+    2001-06-01 custom "journal account name" "Assets:Francis:Bank"
+    2001-06-01 * "Francis Payslip"
+      Assets:Francis:Bank        100 GBP
+      Income:Francis:GrossPay:Salary    -100 GBP
+"""
+
+
+def test_combined_plugin_checks_a_rolling_window(load_doc):
+    """With window_months, Leyna's income from more than a year before the latest income no longer counts."""
+    entries, options_map = load_doc(WINDOW_LEDGER_SOURCE)
+    _, unwindowed_errors = validate_ledger(list(entries), options_map, "documents=off")
+    _, shared_ratio_errors = validate_shared_ratio(list(entries), options_map, "window_months=12")
+    _, transaction_errors = validate_transactions(list(entries), options_map, "documents=off")
+
+    _, combined_errors = validate_ledger(list(entries), options_map, "window_months=12;documents=off")
+
+    assert [e.message for e in combined_errors] == [e.message for e in shared_ratio_errors + transaction_errors]
+    assert [e.message for e in shared_ratio_errors] == [
+        "Shared ratio is incorrect. Actual: {'Francis': '1', 'Leyna': '0'}, Provided: {'Francis': '1', 'Leyna': '1'}"
+    ]
+    assert [e.message for e in unwindowed_errors] == [e.message for e in transaction_errors]
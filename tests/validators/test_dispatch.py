@@ -0,0 +1,69 @@
+"""Tests for routing transactions to the rules whose triggers they contain."""
+
+from beancount_plugins.validators._transactions.features import extract_features
+from beancount_plugins.validators.transactions import TRANSACTION_RULE_INDEX, TRANSACTION_RULES
+
+
+def _matched_rules(entry, party) -> set[str]:
+    candidates = TRANSACTION_RULE_INDEX.match(entry, extract_features(entry), party)
+    return {rule.name for position, rule in enumerate(TRANSACTION_RULES) if candidates >> position & 1}
+
+
+def test_plain_expense_matches_no_rules(load_doc):
+    entries, _ = load_doc("""
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Expenses:Francis:Food
+        2000-01-02 * "Shop" "Groceries"
+          Assets:Francis:Bank        -10 GBP
+          Expenses:Francis:Food       10 GBP
+    """)
+    assert _matched_rules(entries[-1], "Francis") == set()
+
+
+def test_transaction_is_routed_by_tags_meta_and_accounts(load_doc):
+    entries, _ = load_doc("""
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Expenses:Leyna:Electronics
+        2000-01-02 * "Shop" "Camera" #owed-by-leyna #event-paris
+          payslip: "payslip.pdf"
+          Assets:Francis:Bank              -10 GBP
+          Expenses:Leyna:Electronics        10 GBP
+            receipt: "camera.pdf"
+    """)
+    assert _matched_rules(entries[-1], "Francis") == {"owed", "receipt", "payslip", "event"}
+
+
+def test_transfers_component_routes_to_transfer_rule(load_doc):
+    entries, _ = load_doc("""
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Assets:Francis:Transfers:Self
+        2000-01-02 * "Self" "Transfer to self: Assets:Francis:Savings"
+          Assets:Francis:Bank              -10 GBP
+          Assets:Francis:Transfers:Self     10 GBP
+    """)
+    assert _matched_rules(entries[-1], "Francis") == {"transfer"}
+
+
+def test_features_are_collected_in_one_walk(load_doc):
+    entries, _ = load_doc("""
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Expenses:Leyna:Electronics
+        2000-01-02 * "Shop" "Camera"
+          Assets:Francis:Bank              -10 GBP
+          Expenses:Leyna:Electronics        10 GBP
+            receipt: "camera.pdf"
+    """)
+    features = extract_features(entries[-1])
+    assert features.parties == {"Francis", "Leyna"}
+    assert features.roots == {"Assets", "Expenses"}
+    assert features.components == {"Assets", "Francis", "Bank", "Expenses", "Leyna", "Electronics"}
+    assert features.account_prefixes == {
+        "Assets",
+        "Assets:Francis",
+        "Assets:Francis:Bank",
+        "Expenses",
+        "Expenses:Leyna",
+        "Expenses:Leyna:Electronics",
+    }
+    assert "receipt" in features.posting_meta_keys
+    assert features.has_other_party("Francis")
@@ -157,3 +157,25 @@ def test_event_transaction_with_multiple_event_tags(load_doc):
     event_txn_errors = [e for e in errors if e.__class__.__name__ == "EventTransactionError"]
     assert len(event_txn_errors) == 1
     assert event_txn_errors[0].message == "Cannot have multiple event tags"
+
+
+def test_event_transaction_may_reference_later_event(load_doc):
+    """Events are registered before transactions are validated, so a transaction can precede its trip."""
+    entries, options_map = load_doc("""
+        2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Equity:Francis:OpeningBalances
+        2000-01-01 * #journal-opening-balance
+          Assets:Francis:Bank        1 GBP
+          Equity:Francis:OpeningBalances    -1 GBP
+
+        2000-01-15 open Expenses:Francis:Travel
+        2000-01-15 * "Airline" "Flights booked in advance" #event-paris-2000
+          Assets:Francis:Bank        -100 GBP
+          Expenses:Francis:Travel     100 GBP
+
+        2000-02-01 event "trip" "Paris weekend"
+          id: "paris-2000"
+    """)
+    _, errors = validate_transactions(entries, options_map)
+    assert errors == []
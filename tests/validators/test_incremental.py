@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from beancount import loader
+
+from beancount_plugins.validators import incremental, shared_ratio, transactions
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+JOURNAL_SOURCE = """
+2000-01-01 custom "initialise_journal_file" "{party}" "Assets:{party}:Bank"
+2000-01-01 custom "journal account name" "Assets:{party}:Bank"
+2000-01-01 open Assets:{party}:Bank
+2000-01-01 open Equity:{party}:OpeningBalances
+2000-01-01 open Income:{party}:GrossPay:Salary
+2000-01-01 * #journal-opening-balance
+  Assets:{party}:Bank        1 GBP
+  Equity:{party}:OpeningBalances    -1 GBP
+
+2000-01-02 * "Employer" "Salary"
+  Assets:{party}:Bank        {income} GBP
+  Income:{party}:GrossPay:Salary    -{income} GBP
+
+2000-01-03 * "Hotel" "Trip" #event-trip-2000
+  Income:{party}:GrossPay:Salary    -1 GBP
+  Assets:{party}:Bank        1 GBP
+"""
+
+MAIN_SOURCE = """
+include "Francis.beancount"
+include "Leyna.beancount"
+
+2000-01-01 custom "autobean.share.policy" "shared"
+  share-Francis: 1
+  share-Leyna: 0.5
+"""
+
+
+@pytest.fixture
+def retained() -> Iterator[incremental.IncrementalValidator]:
+    yield incremental.enable()
+    incremental.disable()
+
+
+def _write_ledger(tmp_path: Path, francis_income: int, leyna_income: int) -> Path:
+    (tmp_path / "Francis.beancount").write_text(JOURNAL_SOURCE.format(party="Francis", income=francis_income))
+    (tmp_path / "Leyna.beancount").write_text(JOURNAL_SOURCE.format(party="Leyna", income=leyna_income))
+    ledger = tmp_path / "main.beancount"
+    ledger.write_text(MAIN_SOURCE)
+    return ledger
+
+
+def _count_calls(monkeypatch: pytest.MonkeyPatch, module: object, name: str) -> list[int]:
+    calls: list[int] = []
+    func = getattr(module, name)
+
+    def counted(entries: list, *args: object, **kwargs: object) -> object:
+        calls.append(len(entries))
+        return func(entries, *args, **kwargs)
+
+    monkeypatch.setattr(module, name, counted)
+    return calls
+
+
+def _run(ledger: Path) -> list[str]:
+    entries, _, options_map = loader.load_file(str(ledger))
+    _, ratio_errors = shared_ratio.validate_shared_ratio(entries, options_map)
+    _, errors = transactions.validate_transactions(entries, options_map)
+    return [err.message for err in [*ratio_errors, *errors]]
+
+
+def test_reload_only_revalidates_changed_journals(tmp_path, monkeypatch, retained):
+    """A second run over an unchanged ledger reuses everything; editing one journal revalidates only that file."""
+    ledger = _write_ledger(tmp_path, 200, 100)
+    validations = _count_calls(monkeypatch, transactions, "_validate_entries")
+    income_scans = _count_calls(monkeypatch, shared_ratio, "_file_income")
+
+    first = _run(ledger)
+    assert len(validations) == 3
+    assert len(income_scans) == 3
+
+    assert _run(ledger) == first
+    assert len(validations) == 3
+    assert len(income_scans) == 3
+
+    _write_ledger(tmp_path, 200, 50)
+    changed = _run(ledger)
+    assert len(validations) == 4
+    assert len(income_scans) == 4
+    assert retained.ledgers[str(ledger)].income is not None
+
+    incremental.disable()
+    assert _run(ledger) == changed
+    assert changed[0].startswith("Shared ratio is incorrect")
+
+
+@pytest.mark.usefixtures("retained")
+def test_retained_posting_error_keeps_its_posting(tmp_path, monkeypatch):
+    """A posting-level error reused from the previous run is still reported at the posting's line."""
+    ledger = _write_ledger(tmp_path, 200, 100)
+    with (tmp_path / "Leyna.beancount").open("a") as journal:
+        journal.write('2000-01-01 open Expenses:Francis:Gifts\n2000-01-04 * "Shop" "Gift"\n')
+        journal.write("  Assets:Leyna:Bank        -1 GBP\n  Expenses:Francis:Gifts    1 GBP\n")
+    validations = _count_calls(monkeypatch, transactions, "_validate_entries")
+
+    runs = []
+    for _ in range(2):
+        entries, _, options_map = loader.load_file(str(ledger))
+        _, errors = transactions.validate_transactions(entries, options_map)
+        gift = next(entry for entry in entries if getattr(entry, "narration", None) == "Gift")
+        posting_errors = [err for err in errors if err.__class__.__name__ == "PostingToAnotherPartyError"]
+        assert [err.entry for err in posting_errors] == [gift.postings[1]]
+        assert posting_errors[0].entry is gift.postings[1]
+        runs.append([err.source["lineno"] for err in posting_errors])
+
+    assert runs == [[21], [21]]
+    assert len(validations) == 3
@@ -0,0 +1,76 @@
+import json
+import textwrap
+
+import pytest
+from beancount import loader
+
+from beancount_plugins.validators import incremental
+from beancount_plugins.validators._transactions.instrumentation import INSTRUMENTATION_ENV_VAR
+from beancount_plugins.validators.transactions import validate_transactions
+
+SOURCE = """
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 open Assets:Francis:Transfers:Self
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+
+    2000-01-02 * "Someone" "Transfer to self: Assets:Francis:Savings" #transfer-to-self
+      Assets:Francis:Bank              -1 GBP
+      Assets:Francis:Transfers:Self     1 GBP
+
+    2000-02-01 balance Assets:Francis:Bank 0 GBP
+"""
+
+
+def test_instrumentation_reports_each_check_as_json(load_doc, tmp_path):
+    entries, options_map = load_doc(SOURCE)
+    report = tmp_path / "report" / "checks.json"
+
+    _, errors = validate_transactions(entries, options_map, f"instrumentation={report}")
+
+    rows = {row["check"]: row for row in json.loads(report.read_text())}
+    assert rows["rule:transfer:applies"]["calls"] == 1
+    assert rows["rule:transfer:applies"]["matches"] == 1
+    assert rows["rule:transfer:validate"]["errors"] == 1
+    assert rows["rule:opening_balance:validate"]["errors"] == 0
+    assert rows["balance_assertion"]["errors"] == 1
+    assert rows["first_posting_account"]["calls"] == 2
+    assert sum(row["errors"] for row in rows.values()) == len(errors)
+
+
+def test_instrumentation_can_be_enabled_from_the_environment(load_doc, monkeypatch, capsys):
+    entries, options_map = load_doc(SOURCE)
+    monkeypatch.setenv(INSTRUMENTATION_ENV_VAR, "-")
+
+    validate_transactions(entries, options_map)
+
+    table = capsys.readouterr().err.splitlines()
+    assert table[0].split() == ["check", "calls", "matches", "errors", "seconds"]
+    assert any(line.split()[:4] == ["rule:transfer:validate", "1", "1", "1"] for line in table)
+
+
+@pytest.mark.parametrize("incremental_validation", [False, True])
+def test_instrumentation_reports_files_the_cache_would_serve(tmp_path, incremental_validation):
+    """Instrumented runs validate every file, so a second run over an unchanged ledger reports the same checks."""
+    ledger = tmp_path / "ledger.beancount"
+    ledger.write_text(textwrap.dedent(SOURCE))
+    report = tmp_path / "checks.json"
+    if incremental_validation:
+        incremental.enable()
+
+    reports = []
+    try:
+        for _ in range(2):
+            entries, _, options_map = loader.load_file(str(ledger))
+            validate_transactions(
+                entries, options_map, f"validation_cache={tmp_path / 'validation.pickle'};instrumentation={report}"
+            )
+            reports.append({row["check"]: row["calls"] for row in json.loads(report.read_text())})
+    finally:
+        incremental.disable()
+
+    assert reports[1] == reports[0]
+    assert reports[0]["rule:transfer:validate"] == 1
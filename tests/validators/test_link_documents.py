@@ -1,5 +1,40 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from beancount.core import data
+
+from beancount_plugins.validators._transactions import document_resolver
 from beancount_plugins.validators.transactions import validate_transactions
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MULTI_DOCUMENT_SOURCE = """
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+
+    2000-01-02 open Expenses:Francis:Electronics
+    2000-01-02 * "Camera shop" "New camera" #valuables
+      Assets:Francis:Bank        -100 GBP
+      Expenses:Francis:Electronics   100 GBP
+        receipt: "{root}/receipts/camera.pdf"
+
+    2000-04-01 balance Assets:Francis:Bank -99 GBP
+      statement: "{root}/statements/2000-04-30.pdf"
+    2000-05-01 balance Assets:Francis:Bank -99 GBP
+      statement: "{root}/statements/2000-05-31.pdf"
+"""
+
 
 def test_statement_creates_document_entry(load_doc, tmp_path):
     statement = tmp_path / "2000-04-30.pdf"
@@ -93,3 +128,142 @@ def test_missing_statement_file_produces_error(load_doc, tmp_path):
     not_found_errors = [e for e in errors if e.__class__.__name__ == "DocumentFileNotFoundError"]
     assert len(not_found_errors) == 1
     assert "File not found" in not_found_errors[0].message
+
+
+def test_symlinked_document_resolves_to_target(load_doc, tmp_path):
+    statement = tmp_path / "2000-04-30.pdf"
+    statement.touch()
+    link = tmp_path / "links" / "2000-04-30.pdf"
+    link.parent.mkdir()
+    link.symlink_to(statement)
+    entries, options_map = load_doc(f"""
+        2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Equity:Francis:OpeningBalances
+        2000-01-01 * #journal-opening-balance
+          Assets:Francis:Bank        1 GBP
+          Equity:Francis:OpeningBalances    -1 GBP
+
+        2000-04-01 balance Assets:Francis:Bank 1 GBP
+          statement: "{link}"
+    """)
+    extended_entries, errors = validate_transactions(entries, options_map)
+    docs = [e for e in extended_entries if e.__class__.__name__ == "Document"]
+    assert docs[0].filename == str(statement.resolve())
+    assert len(errors) == 0
+
+
+def test_document_cache_is_reused_until_directory_changes(load_doc, tmp_path, monkeypatch):
+    list_directory = document_resolver.list_directory
+    listed: list[Path] = []
+
+    def counted_list_directory(directory: Path) -> document_resolver.DirectoryIndex | None:
+        listed.append(directory)
+        return list_directory(directory)
+
+    monkeypatch.setattr(document_resolver, "list_directory", counted_list_directory)
+    statements = tmp_path / "statements"
+    statements.mkdir()
+    statement = statements / "2000-04-30.pdf"
+    statement.touch()
+    cache = tmp_path / "cache" / "documents.json"
+    source = f"""
+        2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Equity:Francis:OpeningBalances
+        2000-01-01 * #journal-opening-balance
+          Assets:Francis:Bank        1 GBP
+          Equity:Francis:OpeningBalances    -1 GBP
+
+        2000-04-01 balance Assets:Francis:Bank 1 GBP
+          statement: "{statement}"
+    """
+
+    entries, options_map = load_doc(source)
+    _, errors = validate_transactions(entries, options_map, f"document_cache={cache}")
+    assert len(errors) == 0
+    assert listed == [statements.resolve()]
+
+    entries, options_map = load_doc(source)
+    _, errors = validate_transactions(entries, options_map, f"document_cache={cache}")
+    assert len(errors) == 0
+    assert listed == [statements.resolve()]
+
+    statement.unlink()
+    entries, options_map = load_doc(source)
+    _, errors = validate_transactions(entries, options_map, f"document_cache={cache}")
+    not_found_errors = [e for e in errors if e.__class__.__name__ == "DocumentFileNotFoundError"]
+    assert len(not_found_errors) == 1
+    assert listed == [statements.resolve()] * 2
+
+
+def test_concurrent_document_checks_match_serial_checks(load_doc, tmp_path):
+    for name in ("receipts/camera.pdf", "statements/2000-04-30.pdf"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).touch()
+
+    entries, options_map = load_doc(MULTI_DOCUMENT_SOURCE.format(root=tmp_path))
+    serial_entries, serial_errors = validate_transactions(entries, options_map)
+    entries, options_map = load_doc(MULTI_DOCUMENT_SOURCE.format(root=tmp_path))
+    concurrent_entries, concurrent_errors = validate_transactions(
+        entries, options_map, "document_concurrency=4;document_timeout=10"
+    )
+
+    assert [e.message for e in concurrent_errors] == [e.message for e in serial_errors]
+    assert [e.message for e in serial_errors] == [f"File not found: {tmp_path}/statements/2000-05-31.pdf"]
+    assert concurrent_entries == serial_entries
+
+
+def test_slow_document_directory_times_out(load_doc, tmp_path, monkeypatch):
+    list_directory = document_resolver.list_directory
+    release = threading.Event()
+
+    def slow_list_directory(directory: Path) -> document_resolver.DirectoryIndex | None:
+        if directory.name == "statements":
+            release.wait()
+        return list_directory(directory)
+
+    monkeypatch.setattr(document_resolver, "list_directory", slow_list_directory)
+    entries, options_map = load_doc(MULTI_DOCUMENT_SOURCE.format(root=tmp_path))
+    _, errors = validate_transactions(entries, options_map, "document_concurrency=2;document_timeout=0.05")
+    assert [e.message for e in errors] == [
+        f"File not found: {tmp_path}/receipts/camera.pdf",
+        f"Timed out checking file: {tmp_path}/statements/2000-04-30.pdf",
+        f"Timed out checking file: {tmp_path}/statements/2000-05-31.pdf",
+    ]
+    # Release the abandoned listing, so it does not keep running into later tests.
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "document-check":
+            thread.join()
+
+
+def test_slow_document_directory_does_not_delay_exit(tmp_path):
+    """A listing stuck past its timeout runs on a daemon thread, so the interpreter exits without waiting for it."""
+    script = f"""
+import time
+from beancount_plugins.validators._transactions import document_resolver
+
+document_resolver.list_directory = lambda directory: time.sleep(30)
+resolver = document_resolver.DocumentResolver()
+document_resolver.prefetch_directories(resolver, [{str(tmp_path / "receipt.pdf")!r}], 1, 0.2)
+assert resolver.timed_out
+"""
+    start = time.perf_counter()
+    subprocess.run(  # noqa: S603 - runs this interpreter on a script written by the test
+        [sys.executable, "-c", script], check=True, env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    )
+    assert time.perf_counter() - start < 10
+
+
+def test_documents_are_merged_in_sort_order(load_doc, tmp_path):
+    """Document entries are placed where sorting the ledger would put them, without re-sorting it."""
+    entries, options_map = load_doc(MULTI_DOCUMENT_SOURCE.format(root=tmp_path))
+    original = list(entries)
+
+    extended_entries, _ = validate_transactions(entries, options_map)
+
+    docs = [e for e in extended_entries if isinstance(e, data.Document)]
+    assert len(docs) == 3
+    assert extended_entries == sorted(original + docs, key=data.entry_sortkey)
+    assert [e for e in extended_entries if not isinstance(e, data.Document)] == original
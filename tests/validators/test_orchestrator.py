@@ -1,6 +1,17 @@
 """Tests for orchestrator-level concerns of validate_transactions."""
 
-from beancount_plugins.validators.transactions import validate_transactions
+import pickle
+import subprocess
+from pathlib import Path
+
+import pytest
+from beancount import loader
+from beancount.parser import printer
+
+from beancount_plugins.validators import transactions
+from beancount_plugins.validators._transactions.config import RULE_FAMILIES
+from beancount_plugins.validators._transactions.errors import ErrorRecord
+from beancount_plugins.validators.transactions import TRANSACTION_RULES, _entry_checks, validate_transactions
 
 
 def test_exclude_entry_from_validation_skips_entry(load_doc):
@@ -70,3 +81,395 @@ def test_missing_opening_balance_only_fires_once_per_file(load_doc):
     _, errors = validate_transactions(entries, options_map)
     missing_ob_errors = [e for e in errors if e.__class__.__name__ == "MissingOpeningBalanceError"]
     assert len(missing_ob_errors) == 1
+
+
+def test_invalid_plugin_config_is_reported(load_doc):
+    entries, options_map = load_doc("""
+        2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Equity:Francis:OpeningBalances
+        2000-01-01 * #journal-opening-balance
+          Assets:Francis:Bank        1 GBP
+          Equity:Francis:OpeningBalances    -1 GBP
+    """)
+    _, errors = validate_transactions(entries, options_map, "unknown=1;document_cache")
+    assert [e.message for e in errors] == [
+        "Invalid plugin config option: unknown=1",
+        "Invalid plugin config option: document_cache",
+    ]
+
+
+@pytest.mark.parametrize("config", ["workers=2", "workers=2;backend=thread"])
+def test_parallel_validation_matches_serial(tmp_path, monkeypatch, config):
+    """Validating journal files in worker processes or threads reports the same errors, in the same order."""
+    monkeypatch.setattr(transactions, "_free_threaded", lambda: True)
+    for party, other in (("Francis", "Leyna"), ("Leyna", "Francis")):
+        (tmp_path / f"{party}.beancount").write_text(f"""
+2000-01-01 custom "initialise_journal_file" "{party}" "Assets:{party}:Bank"
+2000-01-01 open Assets:{party}:Bank
+2000-01-01 open Equity:{party}:OpeningBalances
+2000-01-01 open Expenses:{party}:Food
+2000-01-01 open Expenses:{other}:Gifts:From{party}
+2000-01-01 * #journal-opening-balance
+  Assets:{party}:Bank        1 GBP
+  Equity:{party}:OpeningBalances    -1 GBP
+
+2000-01-02 * "Shop" "Food"
+  Expenses:{party}:Food    1 GBP
+  Assets:{party}:Bank        -1 GBP
+
+2000-01-03 * "Shop" "Gift"
+  Assets:{party}:Bank        -1 GBP
+  Expenses:{other}:Gifts:From{party}    1 GBP
+
+2000-02-01 balance Assets:{party}:Bank 0 GBP
+""")
+    ledger = tmp_path / "main.beancount"
+    ledger.write_text('include "Francis.beancount"\ninclude "Leyna.beancount"\n')
+    entries, _, options_map = loader.load_file(str(ledger))
+
+    _, serial_errors = validate_transactions(list(entries), options_map)
+    _, parallel_errors = validate_transactions(list(entries), options_map, config)
+
+    assert [(e.source["filename"], e.source["lineno"], e.message, e.entry) for e in parallel_errors] == [
+        (e.source["filename"], e.source["lineno"], e.message, e.entry) for e in serial_errors
+    ]
+    assert all(parallel.entry is serial.entry for parallel, serial in zip(parallel_errors, serial_errors, strict=True))
+    assert len(parallel_errors) == 6
+    posting_errors = [e for e in parallel_errors if e.__class__.__name__ == "PostingToAnotherPartyError"]
+    assert [e.source["lineno"] for e in posting_errors] == [17, 17]
+    assert [e.entry.__class__.__name__ for e in posting_errors] == ["Posting", "Posting"]
+
+
+def test_workers_validate_serially_when_the_process_runs_threads(tmp_path, monkeypatch):
+    """Forking a threaded host could deadlock the workers, so the files are validated in the plugin's own process."""
+    monkeypatch.setattr(transactions.threading, "active_count", lambda: 2)
+    monkeypatch.setattr(transactions, "ProcessPoolExecutor", None)
+    entries, _, options_map = loader.load_file(str(_write_scoped_ledger(tmp_path)))
+
+    _, errors = validate_transactions(entries, options_map, "workers=2")
+
+    assert len(errors) == 6
+
+
+def test_error_cap_summarises_errors_per_rule_and_file(load_doc):
+    """Above the cap, the remaining errors of a rule in a file are replaced by one summary at the first of them."""
+    transactions = "".join(
+        f"""
+        2000-01-{day:02} * "Shop" "Groceries"
+          Assets:Francis:Bank        -1 GBP
+          Expenses:Francis:Food       1 GBP
+        """
+        for day in range(2, 7)
+    )
+    entries, options_map = load_doc(
+        """
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Expenses:Francis:Food
+        """
+        + transactions
+    )
+
+    _, errors = validate_transactions(entries, options_map, "error_cap=2")
+
+    assert [e.__class__.__name__ for e in errors] == ["JournalError", "JournalError", "SuppressedErrorsSummary"]
+    assert errors[2].message == "... and 3 more journal errors in <string> (showing the first 2)"
+    assert errors[2].entry is None
+    assert errors[2].source["lineno"] == 13
+
+
+def test_errors_follow_beancount_error_protocol(load_doc):
+    """Errors expose source, message and entry, print with beancount and survive pickling with their message."""
+    entries, options_map = load_doc("""
+        2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+        2000-01-01 open Assets:Francis:Bank
+        2000-01-01 open Equity:Francis:OpeningBalances
+        2000-01-01 open Expenses:Francis:Food
+        2000-01-01 * #journal-opening-balance
+          Assets:Francis:Bank        1 GBP
+          Equity:Francis:OpeningBalances    -1 GBP
+
+        2000-01-02 * "Shop" "Groceries"
+          Expenses:Francis:Food       1 GBP
+          Assets:Francis:Bank        -1 GBP
+    """)
+    _, errors = validate_transactions(entries, options_map)
+
+    assert len(errors) == 1
+    source, message, entry = errors[0]
+    assert message == "The first posting should be to the account: Assets:Francis:Bank"
+    assert message in printer.format_error(errors[0])
+    restored = pickle.loads(pickle.dumps(errors[0]))  # noqa: S301
+    assert restored == errors[0]
+    assert (restored.source, restored.message, restored.entry) == (source, message, entry)
+
+
+def test_error_codes_name_the_rules_they_come_from():
+    """Every rule family has errors coded by its name, and every error type has a code to be capped by."""
+    codes = {error_type.code for error_type in ErrorRecord.__subclasses__()}
+
+    assert codes >= RULE_FAMILIES
+    assert all(code.isidentifier() for code in codes)
+
+
+RULE_FAMILY_LEDGER = """
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 open Expenses:Francis:Food
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+
+    2000-01-02 event "holiday" "Not a known event type"
+      id: "somewhere"
+
+    2000-01-03 * "Shop" "Groceries" #transfer-to-nowhere
+      Assets:Francis:Bank        -1 GBP
+      Expenses:Francis:Food       1 GBP
+
+    2000-01-04 * "Restaurant" "Lunch" #event-unknown
+      Assets:Francis:Bank        -1 GBP
+      Expenses:Francis:Food       1 GBP
+
+    2000-04-01 balance Assets:Francis:Bank -1 GBP
+      statement: "{statement}"
+"""
+
+
+def test_rules_option_runs_only_the_enabled_rules(load_doc, tmp_path):
+    """Disabled rules, including event directive checks, are never evaluated; documents are still checked."""
+    entries, options_map = load_doc(RULE_FAMILY_LEDGER.format(statement=tmp_path / "2000-04-30.pdf"))
+
+    _, errors = validate_transactions(entries, options_map, "rules=transfer")
+
+    assert sorted(e.__class__.__name__ for e in errors) == ["DocumentFileNotFoundError", "TransferTransactionError"]
+    assert [rule.name for rule in _entry_checks(frozenset({"transfer"}), documents=True).rule_set.rules] == ["transfer"]
+
+
+def test_documents_off_skips_document_checks(load_doc, tmp_path):
+    """With documents=off no document is checked or linked, but the rules still run."""
+    entries, options_map = load_doc(RULE_FAMILY_LEDGER.format(statement=tmp_path / "2000-04-30.pdf"))
+
+    extended_entries, errors = validate_transactions(entries, options_map, "documents=off")
+
+    assert not [e for e in extended_entries if e.__class__.__name__ == "Document"]
+    assert sorted(e.__class__.__name__ for e in errors) == [
+        "EventError",
+        "EventTransactionError",
+        "TransferTransactionError",
+    ]
+
+
+def test_invalid_rules_option_is_reported(load_doc):
+    entries, options_map = load_doc(RULE_FAMILY_LEDGER.format(statement="2000-04-30.pdf"))
+
+    _, errors = validate_transactions(entries, options_map, "rules=transfer,bogus;documents=maybe")
+
+    config_errors = [e for e in errors if e.__class__.__name__ == "PluginConfigError"]
+    assert [e.message.split(":")[0] for e in config_errors] == [
+        "Invalid value for plugin config option rules",
+        "Invalid value for plugin config option documents",
+    ]
+    assert {rule.name for rule in TRANSACTION_RULES} == RULE_FAMILIES
+
+
+def test_thread_backend_runs_serially_with_the_gil(load_doc, monkeypatch):
+    """On a GIL build the thread backend validates in the plugin's own thread instead of taking turns in a pool."""
+    entries, options_map = load_doc(RULE_FAMILY_LEDGER.format(statement="2000-04-30.pdf"))
+    monkeypatch.setattr(transactions, "_free_threaded", lambda: False)
+    monkeypatch.setattr(transactions, "_validate_file_groups_in_threads", None)
+
+    _, errors = validate_transactions(entries, options_map, "workers=4;backend=thread;documents=off")
+
+    assert len(errors) == 3
+
+
+def test_fail_fast_stops_after_the_first_errors(load_doc, tmp_path):
+    """fail_fast=N reports the first N errors of the ledger and skips the document phase."""
+    entries, options_map = load_doc(RULE_FAMILY_LEDGER.format(statement=tmp_path / "2000-04-30.pdf"))
+    _, all_errors = validate_transactions(list(entries), options_map)
+
+    extended_entries, errors = validate_transactions(list(entries), options_map, "fail_fast=2")
+
+    assert [e.message for e in errors] == [e.message for e in all_errors[:2]]
+    assert len(all_errors) == 4
+    assert not [e for e in extended_entries if e.__class__.__name__ == "Document"]
+
+
+def test_fail_fast_can_be_set_from_the_environment(load_doc, monkeypatch):
+    entries, options_map = load_doc(RULE_FAMILY_LEDGER.format(statement="2000-04-30.pdf"))
+    monkeypatch.setenv("BEANCOUNT_PLUGINS_FAIL_FAST", "1")
+    _, errors = validate_transactions(list(entries), options_map)
+    assert [e.__class__.__name__ for e in errors] == ["EventError"]
+
+    monkeypatch.setenv("BEANCOUNT_PLUGINS_FAIL_FAST", "none")
+    _, errors = validate_transactions(list(entries), options_map, "documents=off")
+    assert errors[0].message == (
+        "Invalid value for environment variable BEANCOUNT_PLUGINS_FAIL_FAST: invalid literal for int() with base 10: "
+        "'none'"
+    )
+    assert len(errors) == 4
+
+
+SCOPED_JOURNAL = """
+2000-01-01 custom "initialise_journal_file" "{party}" "Assets:{party}:Bank"
+2000-01-01 open Assets:{party}:Bank
+2000-01-01 open Equity:{party}:OpeningBalances
+2000-01-01 open Expenses:{party}:Food
+2000-01-01 * #journal-opening-balance
+  Assets:{party}:Bank        1 GBP
+  Equity:{party}:OpeningBalances    -1 GBP
+
+2000-01-02 * "Shop" "Old"
+  Expenses:{party}:Food    1 GBP
+  Assets:{party}:Bank        -1 GBP
+
+2000-03-01 balance Assets:{party}:Bank 0 GBP
+
+2000-03-02 * "Shop" "New"
+  Expenses:{party}:Food    1 GBP
+  Assets:{party}:Bank        -1 GBP
+"""
+
+
+DOCUMENTS_LEDGER = """
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 open Expenses:Francis:Valuables
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+
+    2000-01-05 * "Shop" "Old watch" #valuables
+      Assets:Francis:Bank        -1 GBP
+      Expenses:Francis:Valuables  1 GBP
+        receipt: "{root}/old-watch.pdf"
+
+    2000-01-31 balance Assets:Francis:Bank 0 GBP
+      statement: "{root}/2000-02-28.pdf"
+
+    2000-03-05 * "Shop" "New watch" #valuables
+      Assets:Francis:Bank        -1 GBP
+      Expenses:Francis:Valuables  1 GBP
+        receipt: "{root}/new-watch.pdf"
+"""
+
+
+def test_scope_still_links_documents_of_entries_out_of_it(load_doc, tmp_path):
+    """Out-of-scope entries keep their Document entries; only the check that the files exist is skipped."""
+    entries, options_map = load_doc(DOCUMENTS_LEDGER.format(root=tmp_path))
+
+    full_entries, full_errors = validate_transactions(list(entries), options_map)
+    scoped_entries, scoped_errors = validate_transactions(list(entries), options_map, "since=2000-02-01")
+
+    assert scoped_entries == full_entries
+    assert len([entry for entry in scoped_entries if entry.__class__.__name__ == "Document"]) == 3
+    assert [e.message for e in full_errors] == [
+        f"File not found: {tmp_path}/old-watch.pdf",
+        f"File not found: {tmp_path}/2000-02-28.pdf",
+        f"File not found: {tmp_path}/new-watch.pdf",
+    ]
+    assert [e.message for e in scoped_errors] == [f"File not found: {tmp_path}/new-watch.pdf"]
+
+
+def _write_scoped_ledger(tmp_path: Path) -> Path:
+    for party in ("Francis", "Leyna"):
+        (tmp_path / f"{party}.beancount").write_text(SCOPED_JOURNAL.format(party=party))
+    ledger = tmp_path / "main.beancount"
+    ledger.write_text('include "Francis.beancount"\ninclude "Leyna.beancount"\n')
+    return ledger
+
+
+def _error_files(errors: list) -> list[str]:
+    return [Path(e.source["filename"]).name if e.source else e.message for e in errors]
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        ("since=2000-02-01", ["Francis 2000-03-01", "Leyna 2000-03-01", "Francis 2000-03-02", "Leyna 2000-03-02"]),
+        ("party=Leyna", ["Leyna 2000-01-02", "Leyna 2000-03-01", "Leyna 2000-03-02"]),
+        ("since=2000-03-02;party=Leyna,Nobody", ["Leyna 2000-03-02"]),
+    ],
+)
+def test_scope_only_validates_entries_in_it(tmp_path, config, expected):
+    """Out-of-scope entries are not validated, but still count as a journal's opening balance."""
+    entries, _, options_map = loader.load_file(str(_write_scoped_ledger(tmp_path)))
+
+    _, errors = validate_transactions(entries, options_map, config)
+
+    assert [f"{e.entry.meta['filename'].split('/')[-1][:-10]} {e.entry.date}" for e in errors] == expected
+
+
+def test_changed_files_only_validates_the_listed_journals(tmp_path):
+    ledger = _write_scoped_ledger(tmp_path)
+    entries, _, options_map = loader.load_file(str(ledger))
+
+    _, errors = validate_transactions(entries, options_map, "changed_files=Leyna.beancount")
+
+    assert _error_files(errors) == ["Leyna.beancount"] * 3
+
+
+@pytest.mark.parametrize("config", ["", "changed_files=events.beancount", "changed_files=events.beancount;workers=2"])
+def test_changed_events_file_validates_the_transactions_linked_to_it(tmp_path, config):
+    """Renaming an event in the only changed file still reports the unchanged transactions linked to the old id."""
+    (tmp_path / "journal.beancount").write_text("""
+2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+2000-01-01 open Assets:Francis:Bank
+2000-01-01 open Equity:Francis:OpeningBalances
+2000-01-01 open Expenses:Francis:Food
+2000-01-01 * #journal-opening-balance
+  Assets:Francis:Bank        1 GBP
+  Equity:Francis:OpeningBalances    -1 GBP
+
+2000-01-03 * "Restaurant" "Lunch" #event-trip-2000
+  Assets:Francis:Bank        -1 GBP
+  Expenses:Francis:Food       1 GBP
+""")
+    (tmp_path / "events.beancount").write_text('2000-01-02 event "trip" "Paris"\n  id: "trip-2000-paris"\n')
+    ledger = tmp_path / "main.beancount"
+    ledger.write_text('include "journal.beancount"\ninclude "events.beancount"\n')
+    entries, _, options_map = loader.load_file(str(ledger))
+
+    _, errors = validate_transactions(entries, options_map, config)
+
+    assert [(Path(e.source["filename"]).name, e.message) for e in errors] == [
+        ("journal.beancount", "Linked event not found")
+    ]
+
+
+def test_changed_files_from_git(tmp_path):
+    """With changed_files=git, only journals changed since HEAD are validated, and a git failure validates all."""
+    ledger = _write_scoped_ledger(tmp_path)
+    entries, _, options_map = loader.load_file(str(ledger))
+    _, errors = validate_transactions(entries, options_map, "changed_files=git")
+    assert _error_files(errors)[0].startswith("Could not list the changed journal files with git")
+    assert len(errors) == 7
+
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    for command in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "ledger"]):
+        subprocess.run([*git, *command], check=True)  # noqa: S603
+    with (tmp_path / "Francis.beancount").open("a") as journal:
+        journal.write('\n2000-03-03 balance Assets:Francis:Bank -1 GBP\n  statement: "2000-04-02.pdf"\n')
+    entries, _, options_map = loader.load_file(str(ledger))
+
+    _, errors = validate_transactions(entries, options_map, "changed_files=git;documents=off")
+
+    assert _error_files(errors) == ["Francis.beancount"] * 3
+
+
+def test_changed_files_rejects_options_as_revisions(tmp_path):
+    """A revision starting with `-` would be read by git as an option, so it is reported instead of run."""
+    ledger = _write_scoped_ledger(tmp_path)
+    entries, _, options_map = loader.load_file(str(ledger))
+    target = tmp_path / "overwritten"
+
+    _, errors = validate_transactions(entries, options_map, f"changed_files=git:--output={target}")
+
+    assert errors[0].message == (
+        f"Invalid value for plugin config option changed_files: expected a git revision, got '--output={target}'"
+    )
+    assert len(errors) == 7
+    assert not target.exists()
@@ -0,0 +1,44 @@
+import pstats
+import tracemalloc
+
+from beancount_plugins.validators.shared_ratio import validate_shared_ratio
+from beancount_plugins.validators.transactions import validate_transactions
+
+SOURCE = """
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+"""
+
+
+def test_transactions_run_is_profiled_and_traced(load_doc, tmp_path):
+    entries, options_map = load_doc(SOURCE)
+
+    _, errors = validate_transactions(entries, options_map, f"profile=cpu,memory;profile_dir={tmp_path}")
+
+    assert errors == []
+    [profile] = tmp_path.glob("transactions-*.prof")
+    assert any(function == "_validate_transactions" for _, _, function in pstats.Stats(str(profile)).stats)
+    [allocations] = tmp_path.glob("transactions-*-allocations.txt")
+    assert allocations.read_text().startswith("Peak traced memory:")
+    assert not tracemalloc.is_tracing()
+
+
+def test_shared_ratio_run_is_profiled(load_doc, tmp_path):
+    entries, options_map = load_doc(SOURCE)
+
+    validate_shared_ratio(entries, options_map, f"profile=cpu;profile_dir={tmp_path}")
+
+    assert len(list(tmp_path.glob("shared_ratio-*.prof"))) == 1
+    assert list(tmp_path.glob("*-allocations.txt")) == []
+
+
+def test_unknown_profile_mode_is_reported(load_doc):
+    entries, options_map = load_doc(SOURCE)
+    _, errors = validate_transactions(entries, options_map, "profile=cpu,disk")
+    assert [e.message for e in errors] == [
+        "Invalid value for plugin config option profile: expected a comma-separated list of cpu, memory, got 'cpu,disk'"
+    ]
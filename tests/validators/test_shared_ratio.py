@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+from beancount import loader
+
 from beancount_plugins.validators.shared_ratio import calculate_shared_ratio, validate_shared_ratio
 
 
@@ -137,3 +139,164 @@ def test_invalid_shared_ratio_incorrect_ratio(load_doc):
         "Shared ratio is incorrect. Actual: {'Francis': '1', 'Leyna': '0.5'}, "
         "Provided: {'Francis': '1', 'Leyna': '0.6'}"
     )
+
+
+def test_income_is_attributed_to_each_journal_files_party(tmp_path):
+    """Payslips are counted for the party of their own journal file, however the files interleave by date."""
+    for party, income in (("Francis", 200), ("Leyna", 100)):
+        (tmp_path / f"{party}.beancount").write_text(f"""
+2000-01-01 custom "journal account name" "Assets:{party}:Bank"
+2000-01-01 open  Assets:{party}:Bank
+2000-01-01 open  Income:{party}:GrossPay:Salary
+
+2000-01-02 * "{party} Payslip"
+  Assets:{party}:Bank        {income} GBP
+  Income:{party}:GrossPay:Salary    -{income} GBP
+
+2000-02-02 * "{party} Payslip"
+  Assets:{party}:Bank        {income} GBP
+  Income:{party}:GrossPay:Salary    -{income} GBP
+""")
+    ledger = tmp_path / "main.beancount"
+    ledger.write_text("""
+include "Francis.beancount"
+include "Leyna.beancount"
+
+2000-01-01 custom "autobean.share.policy" "shared"
+  share-Francis: 1
+  share-Leyna: 0.5
+""")
+    entries, _, options_map = loader.load_file(str(ledger))
+    _, errors = validate_shared_ratio(entries, options_map)
+    assert len(errors) == 0
+
+
+THREE_PARTY_SOURCE = """
+    2000-01-01 custom "autobean.share.policy" "shared"
+      share-Francis: 1
+      share-Leyna: 0.5
+      share-Sam: 0.25
+
+    2000-01-01 custom "journal account name" "Assets:Francis:Bank"
+    2000-01-01 open  Assets:Francis:Bank
+    2000-01-01 open  Income:Francis:GrossPay:Salary
+    2000-01-01 * "Francis Payslip"
+      Assets:Francis:Bank        200 GBP
+      Income:Francis:GrossPay:Salary    -200 GBP
+
+    2000-01-01 custom "journal account name" "Assets:Leyna:Bank"
+    2000-01-01 open  Assets:Leyna:Bank
+    2000-01-01 open  Income:Leyna:GrossPay:Salary
+    2000-01-01 * "Leyna Payslip"
+      Assets:Leyna:Bank        100 GBP
+      Income:Leyna:GrossPay:Salary    -100 GBP
+
+    2000-01-01 custom "journal account name" "Assets:Sam:Bank"
+    2000-01-01 open  Assets:Sam:Bank
+    2000-01-01 open  Income:Sam:GrossPay:Salary
+    2000-01-01 * "Sam Payslip"
+      Assets:Sam:Bank        50 GBP
+      Income:Sam:GrossPay:Salary    -50 GBP
+"""
+
+
+def test_parties_are_read_from_the_policy(load_doc):
+    entries, options_map = load_doc(THREE_PARTY_SOURCE)
+    _, errors = validate_shared_ratio(entries, options_map)
+    assert len(errors) == 0
+
+
+def test_parties_from_config_override_the_policy(load_doc):
+    entries, options_map = load_doc(THREE_PARTY_SOURCE)
+    _, errors = validate_shared_ratio(entries, options_map, "parties=Leyna, Sam")
+    assert [e.message for e in errors] == [
+        "Shared ratio is incorrect. Actual: {'Leyna': '1', 'Sam': '0.5'}, Provided: {'Leyna': '0.5', 'Sam': '0.25'}"
+    ]
+
+
+def test_invalid_shared_ratio_config_is_reported(load_doc):
+    entries, options_map = load_doc(THREE_PARTY_SOURCE)
+    _, errors = validate_shared_ratio(entries, options_map, "parties=;unknown=1")
+    assert [e.message for e in errors] == [
+        "Invalid value for plugin config option parties: expected a comma-separated list of parties, got ''",
+        "Invalid plugin config option: unknown=1",
+    ]
+
+
+YEARLY_POLICY_SOURCE = """
+    2000-01-01 open  Assets:Francis:Bank
+    2000-01-01 open  Income:Francis:GrossPay:Salary
+    2000-01-01 open  Assets:Leyna:Bank
+    2000-01-01 open  Income:Leyna:GrossPay:Salary
+
+    2000-01-01 custom "autobean.share.policy" "shared"
+      share-Francis: 1
+      share-Leyna: 0.5
+    2001-01-01 custom "autobean.share.policy" "shared"
+      share-Francis: {francis_2001}
+      share-Leyna: 1
+
+    2000-06-01 custom "journal account name" "Assets:Francis:Bank"
+    2000-06-01 * "Francis Payslip"
+      Assets:Francis:Bank        200 GBP
+      Income:Francis:GrossPay:Salary    -200 GBP
+    2000-06-01 custom "journal account name" "Assets:Leyna:Bank"
+    2000-06-01 * "Leyna Payslip"
+      Assets:Leyna:Bank        100 GBP
+      Income:Leyna:GrossPay:Salary    -100 GBP
+
+    2001-06-01 custom "journal account name" "Assets:Francis:Bank"
+    2001-06-01 * "Francis Payslip"
+      Assets:Francis:Bank        100 GBP
+      Income:Francis:GrossPay:Salary    -100 GBP
+    2001-06-01 custom "journal account name" "Assets:Leyna:Bank"
+    2001-06-01 * "Leyna Payslip"
+      Assets:Leyna:Bank        400 GBP
+      Income:Leyna:GrossPay:Salary    -400 GBP
+"""
+
+
+def test_each_policy_is_checked_against_its_own_period(load_doc):
+    entries, options_map = load_doc(YEARLY_POLICY_SOURCE.format(francis_2001="0.25"))
+    _, errors = validate_shared_ratio(entries, options_map)
+    assert len(errors) == 0
+
+
+def test_incorrect_policy_is_reported_at_its_directive(load_doc):
+    entries, options_map = load_doc(YEARLY_POLICY_SOURCE.format(francis_2001="0.5"))
+    _, errors = validate_shared_ratio(entries, options_map)
+    assert len(errors) == 1
+    assert errors[0].entry.date.year == 2001
+    assert errors[0].source == errors[0].entry.meta
+    assert errors[0].message == (
+        "Shared ratio is incorrect. Actual: {'Francis': '0.25', 'Leyna': '1'}, "
+        "Provided: {'Francis': '0.5', 'Leyna': '1'}"
+    )
+
+
+def test_window_months_limits_each_period_to_its_trailing_months(load_doc):
+    """Leyna's only 2000 income falls outside the 7 months before the 2001 policy takes over."""
+    source = YEARLY_POLICY_SOURCE.format(francis_2001="0.25")
+    source = source.replace(
+        '2000-06-01 custom "journal account name" "Assets:Leyna:Bank"',
+        '2000-01-02 custom "journal account name" "Assets:Leyna:Bank"',
+    )
+    source = source.replace('2000-06-01 * "Leyna Payslip"', '2000-01-02 * "Leyna Payslip"')
+    entries, options_map = load_doc(source)
+    _, errors = validate_shared_ratio(entries, options_map, "window_months=7")
+    assert [e.message for e in errors] == [
+        "Shared ratio is incorrect. Actual: {'Francis': '1', 'Leyna': '0'}, Provided: {'Francis': '1', 'Leyna': '0.5'}"
+    ]
+
+
+def test_policies_before_since_are_not_checked(load_doc):
+    """A policy whose period ended before `since` is left alone; the current one is still checked."""
+    entries, options_map = load_doc(YEARLY_POLICY_SOURCE.format(francis_2001="0.5").replace("0.5\n", "0.25\n", 1))
+    _, errors = validate_shared_ratio(entries, options_map)
+    assert [e.entry.date.year for e in errors] == [2000, 2001]
+
+    _, errors = validate_shared_ratio(entries, options_map, "since=2001-01-01")
+    assert [e.entry.date.year for e in errors] == [2001]
+
+    _, errors = validate_shared_ratio(entries, options_map, "party=Nobody")
+    assert errors == []
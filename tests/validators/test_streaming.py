@@ -0,0 +1,58 @@
+"""Tests for validating a ledger fed one entry at a time."""
+
+from beancount_plugins.validators.transactions import TransactionValidator, validate_stream
+
+STREAM_LEDGER = """
+    2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+    2000-01-01 open Assets:Francis:Bank
+    2000-01-01 open Equity:Francis:OpeningBalances
+    2000-01-01 open Expenses:Francis:Food
+    2000-01-01 * #journal-opening-balance
+      Assets:Francis:Bank        1 GBP
+      Equity:Francis:OpeningBalances    -1 GBP
+
+    2000-02-01 * "Restaurant" "Lunch" #event-paris-2000
+      Assets:Francis:Bank        -10 GBP
+      Expenses:Francis:Food       10 GBP
+
+    2000-02-02 * "Restaurant" "Dinner" #event-rome-2000
+      Assets:Francis:Bank        -10 GBP
+      Expenses:Francis:Food       10 GBP
+
+    2000-02-03 * "Shop" "Groceries"
+      Expenses:Francis:Food       1 GBP
+      Assets:Francis:Bank        -1 GBP
+
+    2000-03-01 event "trip" "Paris weekend"
+      id: "paris-2000"
+"""
+
+
+def test_errors_are_reported_as_entries_are_fed(load_doc):
+    """An entry's errors come back from feed; links to events not seen yet wait for finish."""
+    entries, _ = load_doc(STREAM_LEDGER)
+    validator = TransactionValidator()
+
+    fed_errors = [(entry.date.isoformat(), err) for entry in entries for err in validator.feed(entry)[1]]
+    deferred = validator.finish()
+
+    assert [(date, err.__class__.__name__) for date, err in fed_errors] == [
+        ("2000-02-03", "FirstPostingIsNotToSpecifiedAccountError")
+    ]
+    assert [(err.__class__.__name__, err.message, err.entry.narration) for err in deferred] == [
+        ("EventTransactionError", "Linked event not found", "Dinner")
+    ]
+
+
+def test_validate_stream_is_lazy(load_doc):
+    """validate_stream yields an error before the rest of the entries have been consumed."""
+    entries, _ = load_doc(STREAM_LEDGER)
+    consumed = []
+    stream = (consumed.append(entry) or entry for entry in entries)
+
+    errors = validate_stream(stream, "documents=off")
+    first = next(errors)
+
+    assert first.__class__.__name__ == "FirstPostingIsNotToSpecifiedAccountError"
+    assert len(consumed) < len(entries)
+    assert [err.__class__.__name__ for err in errors] == ["EventTransactionError"]
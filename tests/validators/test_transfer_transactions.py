@@ -1,6 +1,17 @@
+import pytest
+
+from beancount_plugins.validators._transactions.transfer import compile_transfer_types
 from beancount_plugins.validators.transactions import validate_transactions
 
 
+def test_transfer_types_are_compiled_once_per_party():
+    transfer_types = compile_transfer_types("Francis")
+    assert compile_transfer_types("Francis") is transfer_types
+    assert transfer_types["transfer-to-leyna"].account == "Assets:Leyna:Transfers:FromFrancis"
+    with pytest.raises(TypeError):
+        transfer_types["transfer-to-self"] = transfer_types["transfer-from-self"]
+
+
 def test_valid_from_transfer_transaction(load_doc):
     entries, options_map = load_doc("""
         2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from beancount import loader
+
+from beancount_plugins.validators import transactions
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+JOURNAL_SOURCE = """
+2000-01-01 custom "initialise_journal_file" "Francis" "Assets:Francis:Bank"
+2000-01-01 open Assets:Francis:Bank
+2000-01-01 open Equity:Francis:OpeningBalances
+2000-01-01 open Expenses:Francis:Entertainment
+2000-01-01 * #journal-opening-balance
+  Assets:Francis:Bank        1 GBP
+  Equity:Francis:OpeningBalances    -1 GBP
+
+2000-01-02 * "Hotel" "Trip" #event-trip-2000
+  Assets:Francis:Bank        -1 GBP
+  Expenses:Francis:Entertainment   1 GBP
+
+2000-02-01 balance Assets:Francis:Bank 0 GBP
+"""
+
+EVENTS_SOURCE = """
+2000-01-01 event "trip" "Trip to Paris"
+  id: "trip-2000"
+"""
+
+
+def _validate(journal: Path, cache: Path) -> list[str]:
+    entries, _, options_map = loader.load_file(str(journal))
+    _, errors = transactions.validate_transactions(entries, options_map, f"validation_cache={cache}")
+    return [err.message for err in errors]
+
+
+def _count_validations(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    calls: list[int] = []
+    validate_entries = transactions._validate_entries  # noqa: SLF001
+
+    def counted(entries: list, *args: object, **kwargs: object) -> object:
+        calls.append(len(entries))
+        return validate_entries(entries, *args, **kwargs)
+
+    monkeypatch.setattr(transactions, "_validate_entries", counted)
+    return calls
+
+
+def _write_ledger(tmp_path: Path, journal_source: str, events_source: str) -> Path:
+    (tmp_path / "journal.beancount").write_text(journal_source)
+    (tmp_path / "events.beancount").write_text(events_source)
+    ledger = tmp_path / "main.beancount"
+    ledger.write_text('include "journal.beancount"\ninclude "events.beancount"\n')
+    return ledger
+
+
+def test_unchanged_journal_is_served_from_cache(tmp_path, monkeypatch):
+    ledger = _write_ledger(tmp_path, JOURNAL_SOURCE, EVENTS_SOURCE)
+    cache = tmp_path / "cache" / "validation.pickle"
+    calls = _count_validations(monkeypatch)
+
+    first = _validate(ledger, cache)
+    validated_on_first_run = len(calls)
+    second = _validate(ledger, cache)
+
+    assert first == second == ["Missing required metadata of 'statement'"]
+    assert validated_on_first_run > 0
+    assert len(calls) == validated_on_first_run
+
+
+def test_edited_journal_is_revalidated(tmp_path, monkeypatch):
+    ledger = _write_ledger(tmp_path, JOURNAL_SOURCE, EVENTS_SOURCE)
+    cache = tmp_path / "validation.pickle"
+    _validate(ledger, cache)
+    calls = _count_validations(monkeypatch)
+
+    statement = tmp_path / "2000-02-29.pdf"
+    edited = JOURNAL_SOURCE.replace("0 GBP\n", f'0 GBP\n  statement: "{statement}"\n')
+    _write_ledger(tmp_path, edited, EVENTS_SOURCE)
+    errors = _validate(ledger, cache)
+
+    assert len(calls) == 1
+    assert errors == [f"File not found: {statement}"]
+
+
+def test_removed_event_revalidates_referring_journal(tmp_path):
+    ledger = _write_ledger(tmp_path, JOURNAL_SOURCE, EVENTS_SOURCE)
+    cache = tmp_path / "validation.pickle"
+    _validate(ledger, cache)
+
+    _write_ledger(tmp_path, JOURNAL_SOURCE, "")
+    errors = _validate(ledger, cache)
+
+    assert "Missing required metadata of 'statement'" in errors
+    assert "Linked event not found" in errors
+
+
+def test_cached_posting_error_keeps_its_posting(tmp_path):
+    """An error raised on a posting is reported at the posting's line whether or not it comes from the cache."""
+    journal = (
+        JOURNAL_SOURCE
+        + """
+2000-01-01 open Expenses:Leyna:Gifts
+2000-02-02 * "Shop" "Gift"
+  Assets:Francis:Bank        -1 GBP
+  Expenses:Leyna:Gifts    1 GBP
+"""
+    )
+    ledger = _write_ledger(tmp_path, journal, EVENTS_SOURCE)
+    cache = tmp_path / "validation.pickle"
+
+    runs = []
+    for _ in range(2):
+        entries, _, options_map = loader.load_file(str(ledger))
+        _, errors = transactions.validate_transactions(entries, options_map, f"validation_cache={cache}")
+        posting_errors = [err for err in errors if err.__class__.__name__ == "PostingToAnotherPartyError"]
+        assert [err.entry for err in posting_errors] == [entries[-1].postings[1]]
+        runs.append([err.source["lineno"] for err in posting_errors])
+
+    assert runs == [[19], [19]]
+
+
+def test_corrupted_cache_is_ignored(tmp_path):
+    """Whatever byte of the cache file is damaged, the plugin validates the ledger rather than crashing."""
+    ledger = _write_ledger(tmp_path, JOURNAL_SOURCE, EVENTS_SOURCE)
+    cache = tmp_path / "validation.pickle"
+    expected = _validate(ledger, cache)
+    source = cache.read_bytes()
+
+    for position in range(len(source)):
+        cache.write_bytes(source[:position] + bytes([source[position] ^ 0xFF]) + source[position + 1 :])
+        assert len(_validate(ledger, cache)) == len(expected)
+    cache.write_bytes(source[: len(source) // 2])
+    assert _validate(ledger, cache) == expected